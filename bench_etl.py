@@ -0,0 +1,201 @@
+# bench_etl.py
+# Micro-benchmarks de etapas del ETL sobre los CSV reales del repo.
+# Uso: python bench_etl.py [nombre ...]   (sin argumentos corre todos)
+import contextlib
+import filecmp
+import io
+import os
+import re
+import sys
+import tempfile
+import time
+import pandas as pd
+
+import etl_expedientes as etl
+import lectores
+from etapas import ejecutar
+
+# =========================
+# Utilidades
+# =========================
+
+def _medir(fn, repeticiones=5):
+    # Mejor tiempo de varias corridas (menos ruido que el promedio)
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+def _reporte(titulo, filas, antes, despues):
+    print(f"{titulo} ({filas} filas)")
+    print(f"  antes:   {antes * 1000:9.1f} ms")
+    print(f"  después: {despues * 1000:9.1f} ms  (x{antes / despues:.1f})")
+
+# =========================
+# 1) Fechas de etl_radicaciones
+# =========================
+
+def bench_fechas(factor=20):
+    fechas = pd.concat([etl.CATALOGO.leer(p)["Fecha"] for p in
+                        ("5_radicaciones.csv", "scraper_completas_terminadas_radicaciones.csv")],
+                       ignore_index=True)
+    fechas = pd.concat([fechas] * factor, ignore_index=True)
+
+    esperado = fechas.map(etl._parse_date)
+    assert esperado.tolist() == etl.convertir_fechas(fechas).tolist(), "convertir_fechas difiere de parse_date"
+
+    antes = _medir(lambda: fechas.map(etl._parse_date))
+    despues = _medir(lambda: etl.convertir_fechas(fechas))
+    _reporte(f"Fechas de radicación x{factor}", len(fechas), antes, despues)
+
+# =========================
+# 2) Campo "responsables" de tribunales_full.csv
+# =========================
+
+def _parse_responsables_regex(txt):
+    # Parser anterior (una búsqueda por campo), se usa como referencia
+    if not isinstance(txt, str) or not txt.strip():
+        return []
+    res = []
+    for b in [b.strip() for b in re.split(r";|\n", txt) if b.strip()]:
+        m_nom = re.search(r"Nombre:\s*([^|]+)", b, re.I)
+        if not m_nom:
+            continue
+        m_car = re.search(r"Cargo:\s*([^|]+)", b, re.I)
+        m_tel = re.search(r"Tel[eé]fono:\s*([\d\s/\-]+)", b, re.I)
+        if not m_tel:
+            m_tel = re.search(r"Tel:\s*([\d\s/\-]+)", b, re.I)
+        email = None
+        for e in re.findall(r"Email:\s*([^|;]+)", b, re.I):
+            e = etl.limpiar_texto(e)
+            if e and "@" in e:
+                email = e
+                break
+        m_sit = re.search(r"Situación:\s*([^|;]+)", b, re.I)
+        nombre = etl.limpiar_texto(m_nom.group(1))
+        tel = etl.limpiar_texto(m_tel.group(1)) if m_tel else None
+        if tel and nombre and nombre in tel:
+            tel = None
+        res.append({
+            "nombre": nombre,
+            "cargo": etl.limpiar_texto(m_car.group(1)) if m_car else None,
+            "telefono": tel,
+            "email": email,
+            "situacion": etl.limpiar_texto(m_sit.group(1)) if m_sit else None
+        })
+    return res
+
+def bench_responsables(factor=50):
+    textos = etl.CATALOGO.leer("tribunales_full.csv")["responsables"].tolist()
+
+    # Golden: mismo resultado que el parser anterior en cada fila del archivo
+    for i, txt in enumerate(textos):
+        assert etl.parse_responsables(txt) == _parse_responsables_regex(txt), f"fila {i} difiere"
+
+    textos = textos * factor
+    antes = _medir(lambda: [_parse_responsables_regex(t) for t in textos])
+    despues = _medir(lambda: [etl.parse_responsables(t) for t in textos])
+    _reporte(f"Responsables x{factor}", len(textos), antes, despues)
+    print(f"  throughput: {len(textos) / despues:,.0f} filas/s")
+
+# =========================
+# 3) Columnas categóricas de intervinientes
+# =========================
+
+def bench_categorias(factor=20):
+    paths = ("5_intervinientes.csv", "scraper_completas_terminadas_intervinientes.csv")
+    texto = pd.concat([pd.read_csv(p, dtype=object) for p in paths] * factor, ignore_index=True)
+    tipado = texto.astype({c: t for c, t in etl.ESQUEMAS[paths[0]]["dtype"].items() if c in texto.columns})
+
+    assert texto.drop_duplicates().equals(tipado.drop_duplicates().astype(object)), "drop_duplicates difiere"
+
+    antes = _medir(lambda: texto.drop_duplicates())
+    despues = _medir(lambda: tipado.drop_duplicates())
+    _reporte(f"drop_duplicates de intervinientes x{factor}", len(texto), antes, despues)
+    mem_texto = texto.memory_usage(deep=True).sum()
+    mem_tipado = tipado.memory_usage(deep=True).sum()
+    print(f"  memoria: {mem_texto / 2**20:.1f} MB -> {mem_tipado / 2**20:.1f} MB  (x{mem_texto / mem_tipado:.1f})")
+
+# =========================
+# 4) Lectores: pd.read_csv vs pyarrow.csv sobre las fuentes x100
+# =========================
+
+def _replicar(path, destino, factor):
+    # Mismo encabezado, cuerpo repetido factor veces
+    with open(path, encoding="utf-8") as f:
+        encabezado = f.readline()
+        cuerpo = f.read()
+    if cuerpo and not cuerpo.endswith("\n"):
+        cuerpo += "\n"
+    with open(destino, "w", encoding="utf-8") as f:
+        f.write(encabezado)
+        for _ in range(factor):
+            f.write(cuerpo)
+
+def bench_lectores(factor=100):
+    if lectores.pa is None:
+        print("Lectores: pyarrow no está instalado, leer_csv usa pd.read_csv")
+    fuentes = [p for p, esq in etl.ESQUEMAS.items() if "lector" not in esq and os.path.exists(p)]
+    antes = despues = 0.0
+    filas = 0
+    with tempfile.TemporaryDirectory() as d:
+        for p in fuentes:
+            grande = os.path.join(d, p)
+            _replicar(p, grande, factor)
+            esquema = etl.ESQUEMAS[p]
+            esperado = pd.read_csv(grande, **esquema)
+            leido = lectores.leer_csv(grande, **esquema)
+            assert esperado.astype(object).equals(leido.astype(object)), f"{p} difiere"
+            filas += len(esperado)
+            antes += _medir(lambda: pd.read_csv(grande, **esquema), repeticiones=3)
+            despues += _medir(lambda: lectores.leer_csv(grande, **esquema), repeticiones=3)
+    _reporte(f"Lectura de {len(fuentes)} fuentes x{factor}", filas, antes, despues)
+
+# =========================
+# 5) Motores pandas / polars (golden: mismos etl_*.csv)
+# =========================
+
+def _correr_motor(motor, destino):
+    # Corre todas las etapas en destino, con las fuentes del repo enlazadas
+    origen = os.getcwd()
+    for e in etl.ETAPAS:
+        for x in e["entradas"]:
+            if os.path.exists(x) and not os.path.exists(os.path.join(destino, x)):
+                os.symlink(os.path.join(origen, x), os.path.join(destino, x))
+    os.chdir(destino)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            ejecutar(etl.etapas_del_motor(motor), workers=1)
+    finally:
+        os.chdir(origen)
+
+def bench_motores():
+    with tempfile.TemporaryDirectory() as d_pd, tempfile.TemporaryDirectory() as d_pl:
+        antes = _medir(lambda: _correr_motor("pandas", d_pd), repeticiones=3)
+        despues = _medir(lambda: _correr_motor("polars", d_pl), repeticiones=3)
+        salidas = sorted(s for e in etl.ETAPAS for s in e["salidas"])
+        _, distintos, faltan = filecmp.cmpfiles(d_pd, d_pl, salidas, shallow=False)
+        assert not distintos and not faltan, f"los motores difieren en {distintos + faltan}"
+        filas = sum(len(pd.read_csv(os.path.join(d_pd, x))) for x in salidas)
+    _reporte(f"ETL completo, pandas -> polars ({len(salidas)} salidas idénticas)", filas, antes, despues)
+
+# =========================
+# MAIN
+# =========================
+
+BENCHS = {
+    "fechas": bench_fechas,
+    "responsables": bench_responsables,
+    "categorias": bench_categorias,
+    "lectores": bench_lectores,
+    "motores": bench_motores,
+}
+
+def main():
+    for nombre in sys.argv[1:] or BENCHS:
+        BENCHS[nombre]()
+
+if __name__ == "__main__":
+    main()
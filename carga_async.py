@@ -0,0 +1,286 @@
+# carga_async.py
+# Carga asíncrona a Postgres con asyncpg. Los registros (dicts con las columnas
+# de los etl_*.csv) se juntan en lotes por tabla; cada lote va con
+# copy_records_to_table a una tabla temporal y de ahí a la tabla destino con el
+# mismo INSERT ... SELECT ... ON CONFLICT que cargar_etl --bulk (TABLAS). Como
+# en --bulk, de un lote que falla por los datos se buscan por bisección las
+# filas culpables, que van a load_rejects, y el resto va de nuevo sin ellas.
+# Los lotes de una tabla van en orden por una sola conexión y en una sola
+# transacción (si la tabla falla no queda a medias), mientras el siguiente lote
+# ya se está leyendo; las tablas que no dependen entre sí (según las claves
+# foráneas del esquema) cargan a la vez con conexiones del pool.
+# Desde los CSV:   python carga_async.py [--lote N] [--workers N]
+# Desde código (p. ej. un scraper, sin pasar por CSV):
+#     async with Cargador(pool) as c:
+#         await c.agregar("expediente", [{"numero_expediente": ..., ...}])
+import argparse
+import asyncio
+import csv
+import os
+import time
+from collections import defaultdict
+
+import asyncpg
+
+from cargar_etl import (DB_CONFIG, SQL_FKS, SQL_TIPOS, TABLAS, TOPE_RECHAZOS, filas_validas, grafo_fk,
+                        motivo_pagina_entera, sql_bulk, sql_preparar)
+from validar_etl import validar
+
+# Registros por lote y lotes leídos por adelantado por tabla
+LOTE = 5000
+EN_VUELO = 2
+
+# =========================
+# Lotes
+# =========================
+
+async def tipos_destino(conn, tabla):
+    return dict(await conn.fetch(SQL_TIPOS.replace("%s", "$1"), tabla))
+
+def columnas_csv(spec):
+    """Columnas del CSV que usa el INSERT ... SELECT de la tabla (las de la staging)"""
+    return list(dict.fromkeys([*spec["columnas"].values(), *spec.get("requeridas", [])]))
+
+SQL_RECHAZO = """
+    INSERT INTO load_rejects (tabla, archivo, fila, datos, error)
+    SELECT $1, $2, s._fila, to_jsonb(s) - '_fila', r.error
+    FROM stg s
+    JOIN unnest($3::bigint[], $4::text[]) AS r(fila, error) ON r.fila = s._fila
+"""
+
+ERRORES_DE_DATOS = (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError)
+
+async def _bisecar(conn, ejecutar, filas, malas, inicio=0):
+    """Igual que cargar_etl._bisecar, con transacciones anidadas (SAVEPOINT)"""
+    if len(malas) >= TOPE_RECHAZOS:
+        return
+    try:
+        async with conn.transaction():
+            await ejecutar(filas)
+    except ERRORES_DE_DATOS as e:
+        if len(filas) == 1:
+            malas.append((inicio, str(e).strip()))
+            return
+        medio = len(filas) // 2
+        await _bisecar(conn, ejecutar, filas[:medio], malas, inicio)
+        await _bisecar(conn, ejecutar, filas[medio:], malas, inicio + medio)
+
+async def cargar_pagina(conn, ejecutar, filas, rechazar):
+    """Igual que cargar_etl.cargar_pagina: si la página falla se buscan las
+    filas culpables, se deshace la búsqueda y la página va de nuevo sin ellas;
+    con TOPE_RECHAZOS culpables, o si igual falla, se rechaza entera"""
+    try:
+        async with conn.transaction():
+            return await ejecutar(filas), 0
+    except ERRORES_DE_DATOS:
+        pass
+    malas = []
+    busqueda = conn.transaction()
+    await busqueda.start()
+    try:
+        await _bisecar(conn, ejecutar, filas, malas)
+    finally:
+        await busqueda.rollback()
+    if len(malas) >= TOPE_RECHAZOS:
+        entera = motivo_pagina_entera(len(filas), malas)
+    else:
+        excluidas = {i for i, _ in malas}
+        buenas = [f for i, f in enumerate(filas) if i not in excluidas]
+        try:
+            async with conn.transaction():
+                if malas:
+                    await rechazar([(filas[i], error) for i, error in malas])
+                resultado = await ejecutar(buenas) if buenas else None
+            return resultado, len(malas)
+        except ERRORES_DE_DATOS as e:
+            entera = motivo_pagina_entera(len(filas), malas, str(e).strip())
+    await rechazar([(f, entera) for f in filas])
+    return None, len(filas)
+
+async def copiar_lote(conn, spec, tipos, columnas, filas, res=None, archivo=None):
+    """Un lote de pares (número de fila, registro) en su transacción (o
+    SAVEPOINT, si ya hay una): COPY a una temporal y INSERT ... SELECT. El
+    número de fila es el que queda en load_rejects. Suma a res insertadas,
+    sin resolver y rechazadas"""
+    res = dict.fromkeys(["insertadas", "sin_resolver", "rechazadas"], 0) if res is None else res
+    insert, sin_resolver_sql = sql_bulk(spec, "stg", tipos, por_rango=True)
+    insert = insert.replace("%(desde)s", "$1").replace("%(hasta)s", "$2")
+    async with conn.transaction():
+        # Dentro de la transacción de la tabla la temporal es una sola para todos los lotes
+        await conn.execute("CREATE TEMP TABLE IF NOT EXISTS stg (_fila BIGINT, "
+                           + ", ".join(f"{c} TEXT" for c in columnas) + ") ON COMMIT DROP")
+        await conn.execute("TRUNCATE stg")
+        await conn.copy_records_to_table(
+            "stg", columns=["_fila"] + columnas,
+            records=[(i, *(r.get(c) for c in columnas)) for i, r in filas])
+
+        async def ejecutar(pagina):
+            # Las filas de la página son las de stg entre la primera y la última
+            return int((await conn.execute(insert, pagina[0][0], pagina[-1][0])).split()[-1])
+
+        async def rechazar(pares):
+            numeros = [i for (i, _), _ in pares]
+            await conn.execute(SQL_RECHAZO, spec["tabla"], archivo, numeros, [e for _, e in pares])
+            await conn.execute("DELETE FROM stg WHERE _fila = ANY($1::bigint[])", numeros)
+
+        insertadas, rechazadas = await cargar_pagina(conn, ejecutar, filas, rechazar)
+        res["insertadas"] += insertadas or 0
+        res["rechazadas"] += rechazadas
+        if sin_resolver_sql:
+            res["sin_resolver"] += await conn.fetchval(sin_resolver_sql)
+    return res
+
+async def _consumir(pool, spec, columnas, cola):
+    res = dict.fromkeys(["insertadas", "sin_resolver", "rechazadas"], 0)
+    async with pool.acquire() as conn:
+        tipos = await tipos_destino(conn, spec["tabla"])
+        async with conn.transaction():
+            while (filas := await cola.get()) is not None:
+                await copiar_lote(conn, spec, tipos, columnas, filas, res, spec["archivo"])
+    return res
+
+# =========================
+# Desde los CSV
+# =========================
+
+async def _encolar(cola, item, consumidor):
+    # Si el consumidor falló, la cola ya no se vacía: en vez de esperar para
+    # siempre se levanta su error
+    put = asyncio.ensure_future(cola.put(item))
+    await asyncio.wait({put, consumidor}, return_when=asyncio.FIRST_COMPLETED)
+    if not put.done():
+        put.cancel()
+        await consumidor
+
+async def cargar_archivo(pool, spec, lote=LOTE):
+    """Lee el CSV de la tabla de a lotes y los va copiando; la lectura del lote
+    siguiente se superpone con la copia del anterior"""
+    with open(spec["archivo"], newline="", encoding="utf-8") as f:
+        columnas = next(csv.reader(f))
+    cola = asyncio.Queue(maxsize=EN_VUELO)
+    consumidor = asyncio.create_task(_consumir(pool, spec, columnas, cola))
+    try:
+        # _fila es el número de fila en el archivo, como en copiar_a_staging,
+        # aunque haya filas en cuarentena antes
+        filas = []
+        for fila in filas_validas(spec["archivo"], numeradas=True):
+            filas.append(fila)
+            if len(filas) == lote:
+                await _encolar(cola, filas, consumidor)
+                filas = []
+        if filas:
+            await _encolar(cola, filas, consumidor)
+        await _encolar(cola, None, consumidor)
+    except BaseException:
+        consumidor.cancel()
+        raise
+    return await consumidor
+
+async def cargar_todo(tablas=TABLAS, lote=LOTE, workers=None):
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tablas)))
+    filas, tiempos = {}, {}
+    async with asyncpg.create_pool(min_size=1, max_size=workers, **_conexion()) as pool:
+        for sql in sql_preparar(tablas):
+            await pool.execute(sql)
+        unidades = {spec["tabla"]: (spec, [spec["tabla"]]) for spec in tablas}
+        deps = grafo_fk(await pool.fetch(SQL_FKS), unidades)
+        tareas = {}
+
+        async def cargar(spec):
+            await asyncio.gather(*(tareas[d] for d in deps[spec["tabla"]]), return_exceptions=True)
+            t0 = time.perf_counter()
+            try:
+                filas[spec["tabla"]] = await cargar_archivo(pool, spec, lote)
+            except Exception as e:
+                print(f"[Error] No se pudo cargar {spec['tabla']}: {e}")
+            finally:
+                tiempos[spec["tabla"]] = time.perf_counter() - t0
+
+        for spec in tablas:
+            tareas[spec["tabla"]] = asyncio.create_task(cargar(spec))
+        await asyncio.gather(*tareas.values())
+
+    print("--- Filas y tiempos por tabla ---")
+    for t in sorted(tiempos, key=tiempos.get, reverse=True):
+        res = filas.get(t, {"insertadas": "error"})
+        print(f"  {t:<16} {res['insertadas']:>8} {tiempos[t]:7.2f} s"
+              + (f"  (sin resolver: {res['sin_resolver']})" if res.get("sin_resolver") else "")
+              + (f"  (rechazadas: {res['rechazadas']}, ver load_rejects)" if res.get("rechazadas") else ""))
+    return filas
+
+def _conexion():
+    # DB_CONFIG usa los nombres de psycopg2
+    c = dict(DB_CONFIG)
+    return {"database": c.pop("dbname"), **c}
+
+# =========================
+# Desde código (scraper)
+# =========================
+
+class Cargador:
+    """Recibe registros de a poco y los manda por lotes. Antes de mandar una
+    tabla se vacían las anteriores en TABLAS, así las claves foráneas ya existen.
+    Cada registro trae las columnas del CSV de su tabla (las que falten van NULL);
+    en load_rejects la fila es su orden de llegada en la tabla."""
+
+    def __init__(self, pool, tablas=TABLAS, lote=LOTE):
+        self.pool = pool
+        self.specs = {spec["tabla"]: spec for spec in tablas}
+        self.orden = list(self.specs)
+        self.lote = lote
+        self.pendientes = defaultdict(list)
+        self.enviadas = defaultdict(int)
+        self.insertadas = defaultdict(int)
+        self.rechazadas = defaultdict(int)
+        self._tipos = {}
+
+    async def __aenter__(self):
+        async with self.pool.acquire() as conn:
+            for sql in sql_preparar(list(self.specs.values())):
+                await conn.execute(sql)
+        return self
+
+    async def __aexit__(self, tipo, *_):
+        if tipo is None:
+            await self.vaciar()
+
+    async def agregar(self, tabla, registros):
+        self.pendientes[tabla].extend(registros)
+        if len(self.pendientes[tabla]) >= self.lote:
+            await self.vaciar(hasta=tabla)
+
+    async def vaciar(self, hasta=None):
+        fin = self.orden.index(hasta) + 1 if hasta else len(self.orden)
+        async with self.pool.acquire() as conn:
+            for tabla in self.orden[:fin]:
+                registros, self.pendientes[tabla] = self.pendientes[tabla], []
+                if not registros:
+                    continue
+                spec = self.specs[tabla]
+                if tabla not in self._tipos:
+                    self._tipos[tabla] = await tipos_destino(conn, tabla)
+                filas = list(enumerate(registros, self.enviadas[tabla]))
+                res = await copiar_lote(conn, spec, self._tipos[tabla], columnas_csv(spec), filas)
+                self.enviadas[tabla] += len(registros)
+                self.insertadas[tabla] += res["insertadas"]
+                self.rechazadas[tabla] += res["rechazadas"]
+
+# =========================
+# MAIN
+# =========================
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga asíncrona de los etl_*.csv con asyncpg")
+    parser.add_argument("--lote", type=int, default=LOTE, help=f"registros por COPY (por defecto {LOTE})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="conexiones del pool (por defecto, una por CPU)")
+    args = parser.parse_args()
+
+    print("=== Iniciando carga asíncrona ===")
+    validar()
+    t0 = time.perf_counter()
+    asyncio.run(cargar_todo(lote=args.lote, workers=args.workers))
+    print(f"=== Carga completa en {time.perf_counter() - t0:.2f} s ===")
+
+if __name__ == "__main__":
+    main()
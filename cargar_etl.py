@@ -1,6 +1,18 @@
 import psycopg2
+from psycopg2.extras import Json, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+import argparse
 import csv
+import io
 import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import partial
+
+from etapas import hash_archivo, ruta_critica
+from validar_etl import DIR_CUARENTENA, filas_en_cuarentena, validar
 
 # ============================================
 # Configuración de conexión
@@ -13,6 +25,11 @@ DB_CONFIG = {
     "port": os.getenv("DB_PORT", "5432"),
 }
 
+# Filas por sentencia en las inserciones en bloque
+PAGINA = 5000
+# Filas culpables de una página a partir de las cuales se rechaza la página entera
+TOPE_RECHAZOS = 100
+
 def conectar_db():
     return psycopg2.connect(**DB_CONFIG)
 
@@ -28,326 +45,1112 @@ def parse_nullable_date(value):
         return None
     return value
 
+def filas_validas(path, numeradas=False):
+    """Filas del CSV, salteando las que validar_etl dejó en cuarentena.
+    Con numeradas, pares (número de fila en el archivo, fila)"""
+    excluidas = filas_en_cuarentena(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            if i not in excluidas:
+                yield (i, row) if numeradas else row
+
 # ============================================
 # Funciones de carga
 # ============================================
 
+def _bisecar(cur, ejecutar, filas, malas, inicio=0):
+    """Filas que hacen fallar ejecutar, por bisección bajo SAVEPOINT: agrega a
+    malas (posición en la página, error). Deja de buscar al llegar a TOPE_RECHAZOS"""
+    if len(malas) >= TOPE_RECHAZOS:
+        return
+    cur.execute("SAVEPOINT lote")
+    try:
+        ejecutar(filas)
+        cur.execute("RELEASE SAVEPOINT lote")
+    except (psycopg2.DataError, psycopg2.IntegrityError) as e:
+        cur.execute("ROLLBACK TO SAVEPOINT lote")
+        cur.execute("RELEASE SAVEPOINT lote")
+        if len(filas) == 1:
+            malas.append((inicio, str(e).strip()))
+            return
+        medio = len(filas) // 2
+        _bisecar(cur, ejecutar, filas[:medio], malas, inicio)
+        _bisecar(cur, ejecutar, filas[medio:], malas, inicio + medio)
+
+def motivo_pagina_entera(total, malas, error=None):
+    """Error en load_rejects de las filas de una página rechazada entera: llegó
+    a TOPE_RECHAZOS culpables, o sin ellas igual falló (error)"""
+    if error is None:
+        return (f"página de {total} filas rechazada entera: {len(malas)} o más filas fallan "
+                f"(la primera: {malas[0][1]})")
+    return f"página de {total} filas rechazada entera: sin sus {len(malas)} filas culpables igual falla ({error})"
+
+def cargar_pagina(cur, ejecutar, filas, rechazar):
+    """Una página de filas bajo SAVEPOINT. Si falla por los datos, bisección
+    para encontrar las filas culpables; lo insertado mientras se buscaba se
+    deshace y la página va de nuevo sin ellas, en una sentencia. Así quedan
+    vivas a lo sumo dos subtransacciones por página (cada una retiene un lock
+    hasta el COMMIT). Con TOPE_RECHAZOS culpables, o si la página sin ellas
+    igual falla, se rechaza entera. rechazar recibe pares (fila, error) y las
+    lleva a load_rejects. Devuelve (lo que devolvió ejecutar o None, rechazadas)"""
+    cur.execute("SAVEPOINT pagina")
+    try:
+        resultado = ejecutar(filas)
+        cur.execute("RELEASE SAVEPOINT pagina")
+        return resultado, 0
+    except (psycopg2.DataError, psycopg2.IntegrityError):
+        cur.execute("ROLLBACK TO SAVEPOINT pagina")
+    malas = []
+    _bisecar(cur, ejecutar, filas, malas)
+    cur.execute("ROLLBACK TO SAVEPOINT pagina")
+    resultado, entera = None, None
+    if len(malas) >= TOPE_RECHAZOS:
+        entera = motivo_pagina_entera(len(filas), malas)
+    else:
+        excluidas = {i for i, _ in malas}
+        buenas = [f for i, f in enumerate(filas) if i not in excluidas]
+        try:
+            if malas:
+                rechazar([(filas[i], error) for i, error in malas])
+            resultado = ejecutar(buenas) if buenas else None
+        except (psycopg2.DataError, psycopg2.IntegrityError) as e:
+            cur.execute("ROLLBACK TO SAVEPOINT pagina")
+            entera = motivo_pagina_entera(len(filas), malas, str(e).strip())
+    if entera:
+        rechazar([(f, entera) for f in filas])
+        malas = filas
+    cur.execute("RELEASE SAVEPOINT pagina")
+    return resultado, len(malas)
+
+def insertar_filas(cur, tabla, sql, filas, en_bloque=False):
+    """Inserta filas (número de fila, fila del CSV, parámetros) de a PAGINA con
+    cargar_pagina y completa row_hash. Con en_bloque, sql es un INSERT ...
+    VALUES %s para execute_values; si no, se ejecuta una vez por fila"""
+    spec = tabla_spec(tabla)
+    res = {"insertadas": 0, "rechazadas": 0}
+
+    def ejecutar(pagina):
+        if en_bloque:
+            execute_values(cur, sql, [p for _, _, p in pagina], page_size=len(pagina))
+            return cur.rowcount
+        insertadas = 0
+        for _, _, p in pagina:
+            cur.execute(sql, p)
+            insertadas += cur.rowcount
+        return insertadas
+
+    def rechazar(pares):
+        execute_values(cur, """
+            INSERT INTO load_rejects (tabla, archivo, fila, datos, error) VALUES %s
+        """, [(tabla, spec["archivo"], fila, Json(row), error) for (fila, row, _), error in pares])
+
+    for desde in range(0, len(filas), PAGINA):
+        insertadas, rechazadas = cargar_pagina(cur, ejecutar, filas[desde:desde + PAGINA], rechazar)
+        res["insertadas"] += insertadas or 0
+        res["rechazadas"] += rechazadas
+    marcar_row_hash(cur, spec)
+    return res
+
+def filas_con_parametros(path, parametros):
+    """(número de fila, fila, parámetros del INSERT) de cada fila válida del CSV"""
+    return [(i, row, parametros(row)) for i, row in filas_validas(path, numeradas=True)]
+
+def _rechazadas(res):
+    return f" (rechazadas: {res['rechazadas']}, ver load_rejects)" if res["rechazadas"] else ""
+
 def cargar_fuero(conn):
     print("Cargando fueros...")
-    count = 0
     try:
-        with conn.cursor() as cur, open("etl_fueros.csv", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                cur.execute("""
-                    INSERT INTO fuero (fuero_id, nombre)
-                    VALUES (%s, %s)
-                    ON CONFLICT (nombre) DO NOTHING
-                """, (parse_nullable(row["fuero_id"]), parse_nullable(row["nombre"])))
-                count += 1
+        filas = filas_con_parametros("etl_fueros.csv", lambda row: (
+            parse_nullable(row["fuero_id"]), parse_nullable(row["nombre"])))
+        with conn.cursor() as cur:
+            res = insertar_filas(cur, "fuero", """
+                INSERT INTO fuero (fuero_id, nombre)
+                VALUES (%s, %s)
+                ON CONFLICT (nombre) DO NOTHING
+            """, filas)
         conn.commit()
-        print(f"Fueros insertados: {count}")
+        print(f"Fueros insertados: {res['insertadas']}{_rechazadas(res)}")
+        return res["insertadas"]
     except Exception as e:
         conn.rollback()
         print(f"[Error] No se pudo cargar fueros: {e}")
 
 def cargar_jurisdiccion(conn):
     print("Cargando jurisdicciones...")
-    count = 0
     try:
-        with conn.cursor() as cur, open("etl_jurisdicciones.csv", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                cur.execute("""
-                    INSERT INTO jurisdiccion (jurisdiccion_id, ambito, provincia, departamento_judicial)
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (jurisdiccion_id) DO NOTHING
-                """, (
-                    parse_nullable(row["jurisdiccion_id"]),
-                    parse_nullable(row["ambito"]),
-                    parse_nullable(row["provincia"]),
-                    parse_nullable(row["departamento_judicial"])
-                ))
-                count += 1
+        filas = filas_con_parametros("etl_jurisdicciones.csv", lambda row: (
+            parse_nullable(row["jurisdiccion_id"]),
+            parse_nullable(row["ambito"]),
+            parse_nullable(row["provincia"]),
+            parse_nullable(row["departamento_judicial"])
+        ))
+        with conn.cursor() as cur:
+            res = insertar_filas(cur, "jurisdiccion", """
+                INSERT INTO jurisdiccion (jurisdiccion_id, ambito, provincia, departamento_judicial)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (jurisdiccion_id) DO NOTHING
+            """, filas)
         conn.commit()
-        print(f"Jurisdicciones insertadas: {count}")
+        print(f"Jurisdicciones insertadas: {res['insertadas']}{_rechazadas(res)}")
+        return res["insertadas"]
     except Exception as e:
         conn.rollback()
         print(f"[Error] No se pudo cargar jurisdicciones: {e}")
 
 def cargar_tribunal(conn):
     print("Cargando tribunales...")
-    count = 0
     try:
-        with conn.cursor() as cur, open("etl_tribunales.csv", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                cur.execute("""
-                    INSERT INTO tribunal (
-                        tribunal_id, nombre, instancia, domicilio_sede,
-                        contacto, jurisdiccion_id, fuero
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (nombre) DO NOTHING
-                """, (
-                    parse_nullable(row["tribunal_id"]),
-                    parse_nullable(row["nombre"]),
-                    parse_nullable(row["instancia"]),
-                    parse_nullable(row["domicilio_sede"]),
-                    parse_nullable(row["contacto"]),
-                    parse_nullable(row["jurisdiccion_id"]),
-                    parse_nullable(row["fuero"])
-                ))
-                count += 1
+        filas = filas_con_parametros("etl_tribunales.csv", lambda row: (
+            parse_nullable(row["tribunal_id"]),
+            parse_nullable(row["nombre"]),
+            parse_nullable(row["instancia"]),
+            parse_nullable(row["domicilio_sede"]),
+            parse_nullable(row["contacto"]),
+            parse_nullable(row["jurisdiccion_id"]),
+            parse_nullable(row["fuero"])
+        ))
+        with conn.cursor() as cur:
+            res = insertar_filas(cur, "tribunal", """
+                INSERT INTO tribunal (
+                    tribunal_id, nombre, instancia, domicilio_sede,
+                    contacto, jurisdiccion_id, fuero
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT DO NOTHING
+            """, filas)
         conn.commit()
-        print(f"Tribunales insertados: {count}")
+        print(f"Tribunales insertados: {res['insertadas']}{_rechazadas(res)}")
+        return res["insertadas"]
     except Exception as e:
         conn.rollback()
         print(f"[Error] No se pudo cargar tribunales: {e}")
 
 def cargar_expediente(conn):
+    # Un expediente con datos que la base no acepta va a load_rejects en lugar
+    # de tirar la tabla entera (y con ella partes, resoluciones, radicaciones...)
     print("Cargando expedientes...")
-    count = 0
     try:
-        with conn.cursor() as cur, open("etl_expedientes.csv", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                cur.execute("""
-                    INSERT INTO expediente (
-                        numero_expediente, caratula, jurisdiccion, tribunal,
-                        estado_procesal, fecha_inicio, fecha_ultimo_movimiento,
-                        camara_origen, ano_inicio, delitos, fiscal, fiscalia
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (numero_expediente) DO NOTHING
-                """, (
-                    parse_nullable(row["numero_expediente"]),
-                    parse_nullable(row["caratula"]),
-                    parse_nullable(row["jurisdiccion"]),
-                    parse_nullable(row["tribunal"]),
-                    parse_nullable(row["estado_procesal"]),
-                    parse_nullable_date(row["fecha_inicio"]),
-                    parse_nullable_date(row["fecha_ultimo_movimiento"]),
-                    parse_nullable(row["camara_origen"]),
-                    parse_nullable(row["ano_inicio"]),
-                    parse_nullable(row["delitos"]),
-                    parse_nullable(row["fiscal"]),
-                    parse_nullable(row["fiscalia"])
-                ))
-                count += 1
+        filas = filas_con_parametros("etl_expedientes.csv", lambda row: (
+            parse_nullable(row["numero_expediente"]),
+            parse_nullable(row["caratula"]),
+            parse_nullable(row["jurisdiccion"]),
+            parse_nullable(row["tribunal"]),
+            parse_nullable(row["estado_procesal"]),
+            parse_nullable_date(row["fecha_inicio"]),
+            parse_nullable_date(row["fecha_ultimo_movimiento"]),
+            parse_nullable(row["camara_origen"]),
+            parse_nullable(row["ano_inicio"]),
+            parse_nullable(row["delitos"]),
+            parse_nullable(row["fiscal"]),
+            parse_nullable(row["fiscalia"])
+        ))
+        with conn.cursor() as cur:
+            res = insertar_filas(cur, "expediente", """
+                INSERT INTO expediente (
+                    numero_expediente, caratula, jurisdiccion, tribunal,
+                    estado_procesal, fecha_inicio, fecha_ultimo_movimiento,
+                    camara_origen, ano_inicio, delitos, fiscal, fiscalia
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (numero_expediente) DO NOTHING
+            """, filas)
         conn.commit()
-        print(f"Expedientes insertados: {count}")
+        print(f"Expedientes insertados: {res['insertadas']}{_rechazadas(res)}")
+        return res["insertadas"]
     except Exception as e:
         conn.rollback()
         print(f"[Error] No se pudo cargar expedientes: {e}")
 
 def cargar_parte_y_rol(conn):
+    # parte_id viene del ETL (hash de expediente + nombre + rol), así que no hace
+    # falta RETURNING para mapear ids: partes y roles van en bloque, en la misma
+    # transacción, y una segunda corrida no duplica nada (rol_parte es único por
+    # parte y nombre).
     print("Cargando partes y roles...")
-    parte_count = rol_count = 0
     try:
-        with conn.cursor() as cur, open("etl_partes.csv", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                cur.execute("""
-                    INSERT INTO parte (numero_expediente, nombre_razon_social)
-                    VALUES (%s, %s)
-                    RETURNING parte_id
-                """, (parse_nullable(row["numero_expediente"]), parse_nullable(row["nombre"])))
-                parte_id = None
-                try:
-                    parte_id = cur.fetchone()[0]
-                except:
-                    pass
-                parte_count += 1
-
-                if parte_id and row.get("rol"):
-                    cur.execute("""
-                        INSERT INTO rol_parte (parte_id, nombre)
-                        VALUES (%s, %s)
-                        ON CONFLICT DO NOTHING
-                    """, (parte_id, parse_nullable(row["rol"])))
-                    rol_count += 1
+        filas = filas_con_parametros("etl_partes.csv", lambda row: tuple(
+            parse_nullable(row[c]) for c in ["parte_id", "numero_expediente", "nombre"]))
+        # Un rol por parte y nombre, el de la primera fila en que aparece
+        roles, vistos = [], set()
+        for i, row, (parte_id, _, _) in filas:
+            rol = parse_nullable(row["rol"])
+            if rol and (parte_id, rol) not in vistos:
+                vistos.add((parte_id, rol))
+                roles.append((i, row, (parte_id, rol)))
+        with conn.cursor() as cur:
+            partes = insertar_filas(cur, "parte", """
+                INSERT INTO parte (parte_id, numero_expediente, nombre_razon_social)
+                VALUES %s
+                ON CONFLICT (parte_id) DO NOTHING
+            """, filas, en_bloque=True)
+            nuevos_roles = insertar_filas(cur, "rol_parte", """
+                INSERT INTO rol_parte (parte_id, nombre)
+                VALUES %s
+                ON CONFLICT (parte_id, nombre) DO NOTHING
+            """, roles, en_bloque=True)
         conn.commit()
-        print(f"Partes insertadas: {parte_count}, Roles insertados: {rol_count}")
+        print(f"Partes insertadas: {partes['insertadas']} de {len(filas)}{_rechazadas(partes)}, "
+              f"Roles insertados: {nuevos_roles['insertadas']} de {len(roles)}{_rechazadas(nuevos_roles)}")
+        return partes["insertadas"] + nuevos_roles["insertadas"]
     except Exception as e:
         conn.rollback()
         print(f"[Error] No se pudo cargar partes/roles: {e}")
 
 def cargar_letrado(conn):
     print("Cargando letrados...")
-    count = 0
     try:
-        with conn.cursor() as cur, open("etl_letrados.csv", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                nombre = parse_nullable(row.get("letrado"))
-                if not nombre:
-                    continue
-                cur.execute("""
-                    INSERT INTO letrado (nombre)
-                    VALUES (%s)
-                    ON CONFLICT (nombre) DO NOTHING
-                """, (nombre,))
-                count += 1
+        filas = [f for f in filas_con_parametros("etl_letrados.csv", lambda row: (
+            parse_nullable(row["letrado_id"]), parse_nullable(row["nombre"]))) if f[2][1]]
+        with conn.cursor() as cur:
+            res = insertar_filas(cur, "letrado", """
+                INSERT INTO letrado (letrado_id, nombre)
+                VALUES %s
+                ON CONFLICT DO NOTHING
+            """, filas, en_bloque=True)
         conn.commit()
-        print(f"Letrados insertados: {count}")
+        print(f"Letrados insertados: {res['insertadas']}{_rechazadas(res)}")
+        return res["insertadas"]
     except Exception as e:
         conn.rollback()
         print(f"[Error] No se pudo cargar letrados: {e}")
 
 def cargar_representacion(conn):
-    print("Cargando representaciones...")
-    count = 0
-    try:
-        with conn.cursor() as cur, open("etl_representaciones.csv", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                cur.execute("SELECT parte_id FROM parte WHERE nombre_razon_social = %s AND numero_expediente = %s",
-                            (parse_nullable(row["nombre_parte"]), parse_nullable(row["numero_expediente"])))
-                parte_id = cur.fetchone()
-                cur.execute("SELECT letrado_id FROM letrado WHERE nombre = %s",
-                            (parse_nullable(row["letrado"]),))
-                letrado_id = cur.fetchone()
-
-                if parte_id and letrado_id:
-                    cur.execute("""
-                        INSERT INTO representacion (numero_expediente, parte_id, letrado_id, rol)
-                        VALUES (%s, %s, %s, %s)
-                        ON CONFLICT DO NOTHING
-                    """, (
-                        parse_nullable(row["numero_expediente"]),
-                        parte_id[0],
-                        letrado_id[0],
-                        parse_nullable(row.get("rol"))
-                    ))
-                    count += 1
-        conn.commit()
-        print(f"Representaciones insertadas: {count}")
-    except Exception as e:
-        conn.rollback()
-        print(f"[Error] No se pudo cargar representaciones: {e}")
+    # Un solo INSERT ... SELECT: el CSV va a staging y se cruza contra parte y
+    # letrado dentro de la base; las filas que no resuelven se cuentan.
+    # cargar_spec_bulk borra la staging también si la carga falla
+    return cargar_spec_bulk(conn, tabla_spec("representacion"))
 
 def cargar_resolucion(conn):
     print("Cargando resoluciones...")
-    count = 0
     try:
-        with conn.cursor() as cur, open("etl_resoluciones.csv", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                cur.execute("""
-                    INSERT INTO resolucion (numero_expediente, fecha, nombre, link)
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT DO NOTHING
-                """, (
-                    parse_nullable(row["numero_expediente"]),
-                    parse_nullable_date(row["fecha"]),
-                    parse_nullable(row["nombre"]),
-                    parse_nullable(row["link"])
-                ))
-                count += 1
+        filas = filas_con_parametros("etl_resoluciones.csv", lambda row: (
+            parse_nullable(row["numero_expediente"]),
+            parse_nullable_date(row["fecha"]),
+            parse_nullable(row["nombre"]),
+            parse_nullable(row["link"])
+        ))
+        with conn.cursor() as cur:
+            res = insertar_filas(cur, "resolucion", """
+                INSERT INTO resolucion (numero_expediente, fecha, nombre, link)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT DO NOTHING
+            """, filas)
         conn.commit()
-        print(f"Resoluciones insertadas: {count}")
+        print(f"Resoluciones insertadas: {res['insertadas']}{_rechazadas(res)}")
+        return res["insertadas"]
     except Exception as e:
         conn.rollback()
         print(f"[Error] No se pudo cargar resoluciones: {e}")
 
 def cargar_radicacion(conn):
     print("Cargando radicaciones...")
-    count = 0
     try:
-        with conn.cursor() as cur, open("etl_radicaciones.csv", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                cur.execute("""
-                    INSERT INTO radicacion (
-                        numero_expediente, orden, fecha_radicacion,
-                        tribunal, fiscal_nombre, fiscalia
-                    )
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (numero_expediente, orden) DO NOTHING
-                """, (
-                    parse_nullable(row["numero_expediente"]),
-                    parse_nullable(row["orden"]),
-                    parse_nullable_date(row["fecha_radicacion"]),
-                    parse_nullable(row["tribunal"]),
-                    parse_nullable(row["fiscal_nombre"]),
-                    parse_nullable(row["fiscalia"])
-                ))
-                count += 1
+        filas = filas_con_parametros("etl_radicaciones.csv", lambda row: (
+            parse_nullable(row["numero_expediente"]),
+            parse_nullable(row["orden"]),
+            parse_nullable_date(row["fecha_radicacion"]),
+            parse_nullable(row["tribunal"]),
+            parse_nullable(row["fiscal_nombre"]),
+            parse_nullable(row["fiscalia"])
+        ))
+        with conn.cursor() as cur:
+            res = insertar_filas(cur, "radicacion", """
+                INSERT INTO radicacion (
+                    numero_expediente, orden, fecha_radicacion,
+                    tribunal, fiscal_nombre, fiscalia
+                )
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON CONFLICT (numero_expediente, orden) DO NOTHING
+            """, filas)
         conn.commit()
-        print(f"Radicaciones insertadas: {count}")
+        print(f"Radicaciones insertadas: {res['insertadas']}{_rechazadas(res)}")
+        return res["insertadas"]
     except Exception as e:
         conn.rollback()
         print(f"[Error] No se pudo cargar radicaciones: {e}")
 
 def cargar_juez(conn):
     print("Cargando jueces...")
-    count = 0
     try:
-        with conn.cursor() as cur, open("etl_jueces.csv", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                cur.execute("""
-                    INSERT INTO juez (juez_id, nombre, email, telefono)
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (nombre) DO NOTHING
-                """, (
-                    parse_nullable(row["juez_id"]),
-                    parse_nullable(row["nombre"]),
-                    parse_nullable(row["email"]),
-                    parse_nullable(row["telefono"])
-                ))
-                count += 1
+        filas = filas_con_parametros("etl_jueces.csv", lambda row: (
+            parse_nullable(row["juez_id"]),
+            parse_nullable(row["nombre"]),
+            parse_nullable(row["email"]),
+            parse_nullable(row["telefono"])
+        ))
+        with conn.cursor() as cur:
+            res = insertar_filas(cur, "juez", """
+                INSERT INTO juez (juez_id, nombre, email, telefono)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT DO NOTHING
+            """, filas)
         conn.commit()
-        print(f"Jueces insertados: {count}")
+        print(f"Jueces insertados: {res['insertadas']}{_rechazadas(res)}")
+        return res["insertadas"]
     except Exception as e:
         conn.rollback()
         print(f"[Error] No se pudo cargar jueces: {e}")
 
 def cargar_tribunal_juez(conn):
     print("Cargando relaciones tribunal-juez...")
-    count = 0
     try:
-        with conn.cursor() as cur, open("etl_tribunal_juez.csv", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                cur.execute("""
-                    INSERT INTO tribunal_juez (tribunal_id, juez_id, cargo, situacion)
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT DO NOTHING
-                """, (
-                    parse_nullable(row["tribunal_id"]),
-                    parse_nullable(row["juez_id"]),
-                    parse_nullable(row["cargo"]),
-                    parse_nullable(row["situacion"])
-                ))
-                count += 1
+        filas = filas_con_parametros("etl_tribunal_juez.csv", lambda row: (
+            parse_nullable(row["tribunal_id"]),
+            parse_nullable(row["juez_id"]),
+            parse_nullable(row["cargo"]),
+            parse_nullable(row["situacion"])
+        ))
+        with conn.cursor() as cur:
+            res = insertar_filas(cur, "tribunal_juez", """
+                INSERT INTO tribunal_juez (tribunal_id, juez_id, cargo, situacion)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT DO NOTHING
+            """, filas)
         conn.commit()
-        print(f"Relaciones tribunal-juez insertadas: {count}")
+        print(f"Relaciones tribunal-juez insertadas: {res['insertadas']}{_rechazadas(res)}")
+        return res["insertadas"]
     except Exception as e:
         conn.rollback()
         print(f"[Error] No se pudo cargar tribunal-juez: {e}")
 
+# ============================================
+# Carga en bloque (--bulk): COPY a staging + INSERT ... SELECT
+# ============================================
+
+# Una entrada por tabla destino, en orden de claves foráneas. "columnas" es
+# columna de la tabla -> columna del CSV; "requeridas" son columnas del CSV que
+# deben tener valor (las filas sin él se saltean, igual que en la carga fila a fila).
+# "referencias" (columna de la tabla -> (tabla, columna)) resuelve las claves
+# foráneas con un join: las filas que no resuelven no se insertan y se cuentan.
+# "clave" es la clave (UNIQUE o PK) contra la que se hace el merge: la natural,
+# o el id estable que el ETL deriva de ella.
+TABLAS = [
+    {"tabla": "fuero", "archivo": "etl_fueros.csv",
+     "columnas": {"fuero_id": "fuero_id", "nombre": "nombre"},
+     "clave": ["nombre"]},
+    {"tabla": "jurisdiccion", "archivo": "etl_jurisdicciones.csv",
+     "columnas": {c: c for c in ["jurisdiccion_id", "ambito", "provincia", "departamento_judicial"]},
+     "clave": ["jurisdiccion_id"]},
+    {"tabla": "tribunal", "archivo": "etl_tribunales.csv",
+     "columnas": {c: c for c in ["tribunal_id", "nombre", "instancia", "domicilio_sede",
+                                 "contacto", "jurisdiccion_id", "fuero"]},
+     "clave": ["tribunal_id"]},
+    {"tabla": "expediente", "archivo": "etl_expedientes.csv",
+     "columnas": {c: c for c in ["numero_expediente", "caratula", "jurisdiccion", "tribunal",
+                                 "estado_procesal", "fecha_inicio", "fecha_ultimo_movimiento",
+                                 "camara_origen", "ano_inicio", "delitos", "fiscal", "fiscalia"]},
+     "clave": ["numero_expediente"]},
+    {"tabla": "parte", "archivo": "etl_partes.csv",
+     "columnas": {"parte_id": "parte_id", "numero_expediente": "numero_expediente",
+                  "nombre_razon_social": "nombre"},
+     "clave": ["parte_id"]},
+    {"tabla": "rol_parte", "archivo": "etl_partes.csv",
+     "columnas": {"parte_id": "parte_id", "nombre": "rol"},
+     "requeridas": ["rol"],
+     "clave": ["parte_id", "nombre"]},
+    {"tabla": "letrado", "archivo": "etl_letrados.csv",
+     "columnas": {"letrado_id": "letrado_id", "nombre": "nombre"},
+     "requeridas": ["nombre"],
+     "clave": ["letrado_id"]},
+    {"tabla": "representacion", "archivo": "etl_representaciones.csv",
+     "columnas": {c: c for c in ["numero_expediente", "parte_id", "letrado_id", "rol"]},
+     "referencias": {"numero_expediente": ("expediente", "numero_expediente"),
+                     "parte_id": ("parte", "parte_id"),
+                     "letrado_id": ("letrado", "letrado_id")},
+     "clave": ["numero_expediente", "parte_id", "letrado_id"]},
+    {"tabla": "resolucion", "archivo": "etl_resoluciones.csv",
+     "columnas": {c: c for c in ["numero_expediente", "fecha", "nombre", "link"]},
+     "clave": ["numero_expediente", "fecha", "nombre", "link"]},
+    {"tabla": "radicacion", "archivo": "etl_radicaciones.csv",
+     "columnas": {"numero_expediente": "numero_expediente", "orden": "orden",
+                  "fecha_radicacion": "fecha_radicacion", "tribunal": "tribunal",
+                  "fiscal_nombre": "fiscal_nombre", "fiscalia": "fiscalia"},
+     "clave": ["numero_expediente", "orden"]},
+    {"tabla": "juez", "archivo": "etl_jueces.csv",
+     "columnas": {c: c for c in ["juez_id", "nombre", "email", "telefono"]},
+     "clave": ["juez_id"]},
+    {"tabla": "tribunal_juez", "archivo": "etl_tribunal_juez.csv",
+     "columnas": {c: c for c in ["tribunal_id", "juez_id", "cargo", "situacion"]},
+     "clave": ["tribunal_id", "juez_id"]},
+]
+
+def tabla_spec(tabla):
+    return next(spec for spec in TABLAS if spec["tabla"] == tabla)
+
+def _nullable_sql(col):
+    """parse_nullable en SQL: vacío o solo espacios -> NULL, el resto tal cual"""
+    return f"CASE WHEN s.{col} ~ '^\\s*$' THEN NULL ELSE s.{col} END"
+
+# Tipo sin largo (varchar, no varchar(200)): un cast explícito a varchar(n)
+# recorta en silencio, en cambio la asignación a la columna falla como en la carga fila a fila
+SQL_TIPOS = """
+    SELECT attname, format_type(atttypid, NULL)
+    FROM pg_attribute
+    WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+"""
+
+def _tipos_destino(cur, tabla):
+    cur.execute(SQL_TIPOS, (tabla,))
+    return dict(cur.fetchall())
+
+def _csv_validas(path):
+    """Encabezado y CSV en memoria con las filas fuera de cuarentena, listo para COPY"""
+    with open(path, newline="", encoding="utf-8") as f:
+        encabezado = next(csv.reader(f))
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for i, row in filas_validas(path, numeradas=True):
+        writer.writerow([i] + [row[c] for c in encabezado])
+    buf.seek(0)
+    return encabezado, buf
+
+def copiar_a_staging(cur, spec):
+    """COPY del CSV a una tabla UNLOGGED de texto; _fila es el número de fila en
+    el archivo. Una staging por tabla destino, así las cargas en paralelo no se pisan"""
+    staging = f"stg_{spec['tabla']}"
+    encabezado, buf = _csv_validas(spec["archivo"])
+    cur.execute(f"DROP TABLE IF EXISTS {staging}")
+    cur.execute(f"CREATE UNLOGGED TABLE {staging} (_fila BIGINT PRIMARY KEY, "
+                + ", ".join(f"{c} TEXT" for c in encabezado) + ")")
+    cur.copy_expert(f"COPY {staging} (_fila, {', '.join(encabezado)}) FROM STDIN WITH (FORMAT csv)", buf)
+    return staging
+
+def columnas_hash(spec):
+    """Columnas que entran en row_hash: las que el merge reescribe (todas menos
+    la clave y el id de la tabla)"""
+    fijas = set(spec["clave"]) | {f"{spec['tabla']}_id"}
+    return [c for c in spec["columnas"] if c not in fijas]
+
+def sql_row_hash(spec, valores=None):
+    """row_hash de una fila: md5 de columnas_hash ya convertidas al tipo de la
+    tabla (valores: esas mismas expresiones, si no son las columnas). Lo
+    escriben todos los caminos de carga, así el primer merge después de una
+    carga común no reescribe filas que no cambiaron"""
+    return f"md5(ROW({', '.join(valores or columnas_hash(spec))})::text)"
+
+def marcar_row_hash(cur, spec):
+    # Carga fila a fila: el hash se calcula en la base sobre las filas recién insertadas
+    cur.execute(f"UPDATE {spec['tabla']} SET row_hash = {sql_row_hash(spec)} WHERE row_hash IS NULL")
+
+def sql_bulk(spec, staging, tipos, merge=False, por_rango=False):
+    """SQL del INSERT ... SELECT desde staging y del conteo de filas sin resolver
+    (None si la tabla no tiene "referencias"). Con por_rango, el INSERT solo toma
+    las filas con _fila entre %(desde)s y %(hasta)s.
+    Cada fila lleva row_hash; con merge, una fila existente solo se reescribe
+    si su hash cambió; la sentencia devuelve (insertadas, actualizadas, sin cambios),
+    según RETURNING (xmax = 0 es una fila nueva)."""
+    destino = list(spec["columnas"])
+    valor = {c: f"({_nullable_sql(spec['columnas'][c])})::{tipos[c]}" for c in destino}
+    filtro = " AND ".join(f"({_nullable_sql(c)}) IS NOT NULL" for c in spec.get("requeridas", [])) or "TRUE"
+    referencias = spec.get("referencias", {})
+    joins = "".join(f"\n        JOIN {t} r{i} ON r{i}.{col} = {valor[c]}"
+                    for i, (c, (t, col)) in enumerate(referencias.items()))
+    rango = " AND s._fila BETWEEN %(desde)s AND %(hasta)s" if por_rango else ""
+    if not merge:
+        insert = f"""
+        INSERT INTO {spec['tabla']} ({', '.join(destino)}, row_hash)
+        SELECT {', '.join(valor.values())}, {sql_row_hash(spec, [valor[c] for c in columnas_hash(spec)])}
+        FROM {staging} s{joins}
+        WHERE {filtro}{rango}
+        ORDER BY s._fila
+        ON CONFLICT DO NOTHING
+    """
+    else:
+        # DO UPDATE no admite dos filas con la misma clave en una sentencia:
+        # queda la primera del archivo, como con DO NOTHING
+        clave = ", ".join(spec["clave"])
+        cambios = columnas_hash(spec) + ["row_hash"]
+        insert = f"""
+        WITH fuente AS (
+            SELECT DISTINCT ON ({clave}) *
+            FROM (SELECT s._fila, {', '.join(f'{v} AS {c}' for c, v in valor.items())}
+                  FROM {staging} s{joins}
+                  WHERE {filtro}{rango}) f
+            ORDER BY {clave}, _fila
+        ), escritas AS (
+            INSERT INTO {spec['tabla']} AS t ({', '.join(destino)}, row_hash)
+            SELECT {', '.join(destino)}, {sql_row_hash(spec)}
+            FROM fuente
+            ORDER BY _fila
+            ON CONFLICT ({clave}) DO UPDATE
+            SET {', '.join(f'{c} = EXCLUDED.{c}' for c in cambios)}
+            WHERE t.row_hash IS DISTINCT FROM EXCLUDED.row_hash
+            RETURNING (xmax = 0) AS nueva
+        )
+        SELECT count(*) FILTER (WHERE nueva), count(*) FILTER (WHERE NOT nueva),
+               (SELECT count(*) FROM fuente) - count(*)
+        FROM escritas
+    """
+    if not referencias:
+        return insert, None
+    resueltas = " AND ".join(f"EXISTS (SELECT 1 FROM {t} WHERE {t}.{col} = {valor[c]})"
+                             for c, (t, col) in referencias.items())
+    return insert, f"SELECT count(*) FROM {staging} s WHERE {filtro} AND NOT ({resueltas})"
+
+def sql_duplicados(spec, staging):
+    """Borra del staging las filas con clave repetida salvo la primera, así cada
+    lote del merge ve una sola fila por clave aunque los repetidos caigan en lotes distintos"""
+    clave = ", ".join(_nullable_sql(c) for c in (spec["columnas"][k] for k in spec["clave"]))
+    return f"""
+        DELETE FROM {staging} d
+        USING (SELECT _fila, row_number() OVER (PARTITION BY {clave} ORDER BY _fila) AS n
+               FROM {staging} s) r
+        WHERE d._fila = r._fila AND r.n > 1
+    """
+
+SQL_LOAD_REJECTS = """
+    CREATE TABLE IF NOT EXISTS load_rejects (
+        reject_id SERIAL PRIMARY KEY,
+        tabla TEXT NOT NULL,
+        archivo TEXT,
+        fila BIGINT,
+        datos JSONB,
+        error TEXT,
+        rechazada_en TIMESTAMPTZ DEFAULT now()
+    )
+"""
+
+# Índices y claves foráneas que --full-reload sacó y todavía no volvió a crear
+SQL_LOAD_DEFERRED_DDL = """
+    CREATE TABLE IF NOT EXISTS load_deferred_ddl (
+        tipo TEXT NOT NULL CHECK (tipo IN ('indice', 'fk')),
+        tabla TEXT NOT NULL,
+        nombre TEXT NOT NULL,
+        definicion TEXT NOT NULL,
+        guardado_en TIMESTAMPTZ DEFAULT now(),
+        PRIMARY KEY (tipo, tabla, nombre)
+    )
+"""
+
+SQL_LOAD_MANIFEST = """
+    CREATE TABLE IF NOT EXISTS load_manifest (
+        tabla TEXT PRIMARY KEY,
+        archivo TEXT NOT NULL,
+        checksum TEXT NOT NULL,
+        filas BIGINT,
+        cargado_en TIMESTAMPTZ DEFAULT now()
+    )
+"""
+
+# Cambios de initdb/init.sql que una base ya creada no tiene (docker solo corre
+# init.sql con el volumen vacío). Ids estables del ETL: antes SERIAL / INTEGER
+IDS_ESTABLES = [("parte", "parte_id"), ("letrado", "letrado_id"), ("rol_parte", "parte_id"),
+                ("representacion", "parte_id"), ("representacion", "letrado_id"),
+                ("tribunal", "tribunal_id"), ("secretaria", "tribunal_id"), ("expediente", "id_tribunal"),
+                ("juez", "juez_id"), ("tribunal_juez", "tribunal_id"), ("tribunal_juez", "juez_id")]
+
+RESTRICCIONES = [
+    ("rol_parte", "uq_rol_parte_parte_nombre", "UNIQUE (parte_id, nombre)"),
+    ("resolucion", "uq_resolucion", "UNIQUE NULLS NOT DISTINCT (numero_expediente, fecha, nombre, link)"),
+]
+
+INDICES = [
+    "CREATE INDEX IF NOT EXISTS idx_representacion_parte ON representacion(parte_id)",
+    "CREATE INDEX IF NOT EXISTS idx_representacion_letrado ON representacion(letrado_id)",
+]
+
+def _sql_a_bigint(tabla, col):
+    # Sin DEFAULT: el id ya no sale de la secuencia del SERIAL
+    return f"""
+        DO $$ BEGIN
+            IF (SELECT atttypid <> 'bigint'::regtype FROM pg_attribute
+                WHERE attrelid = '{tabla}'::regclass AND attname = '{col}') THEN
+                ALTER TABLE {tabla} ALTER COLUMN {col} DROP DEFAULT, ALTER COLUMN {col} TYPE BIGINT;
+            END IF;
+        END $$
+    """
+
+def _sql_restriccion(tabla, nombre, definicion):
+    return f"""
+        DO $$ BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint
+                           WHERE conrelid = '{tabla}'::regclass AND conname = '{nombre}') THEN
+                ALTER TABLE {tabla} ADD CONSTRAINT {nombre} {definicion};
+            END IF;
+        END $$
+    """
+
+def sql_preparar(tablas=TABLAS):
+    """Lleva una base creada con un init.sql anterior al esquema actual: tablas
+    de control de la carga, row_hash, ids BIGINT, restricciones UNIQUE e
+    índices. Cada sentencia se puede correr de nuevo sin efecto"""
+    return ([SQL_LOAD_REJECTS, SQL_LOAD_DEFERRED_DDL, SQL_LOAD_MANIFEST]
+            + [f"ALTER TABLE {spec['tabla']} ADD COLUMN IF NOT EXISTS row_hash TEXT" for spec in tablas]
+            + [_sql_a_bigint(t, c) for t, c in IDS_ESTABLES]
+            + [_sql_restriccion(*r) for r in RESTRICCIONES]
+            + INDICES)
+
+def preparar_base(conn, tablas=TABLAS):
+    try:
+        with conn.cursor() as cur:
+            for sql in sql_preparar(tablas):
+                cur.execute(sql)
+        conn.commit()
+    except psycopg2.Error as e:
+        conn.rollback()
+        raise RuntimeError(f"No se pudo llevar la base al esquema de initdb/init.sql: {str(e).strip()}")
+
+def insertar_por_lotes(conn, spec, staging, merge=False):
+    """INSERT ... SELECT desde staging de a PAGINA filas con cargar_pagina. Las
+    filas rechazadas pasan de staging a load_rejects (no cuentan como sin
+    resolver). Devuelve los conteos de la tabla"""
+    res = dict.fromkeys(["insertadas", "actualizadas", "sin_cambios", "sin_resolver", "rechazadas"], 0)
+    with conn.cursor() as cur:
+        insert, sin_resolver_sql = sql_bulk(spec, staging, _tipos_destino(cur, spec["tabla"]),
+                                            merge=merge, por_rango=True)
+        if merge:
+            cur.execute(sql_duplicados(spec, staging))
+
+        def ejecutar(pagina):
+            # Las filas de la página son las de staging entre la primera y la última
+            cur.execute(insert, {"desde": pagina[0], "hasta": pagina[-1]})
+            return cur.fetchone() if merge else (cur.rowcount, 0, 0)
+
+        def rechazar(pares):
+            cur.execute(f"""
+                INSERT INTO load_rejects (tabla, archivo, fila, datos, error)
+                SELECT %s, %s, s._fila, to_jsonb(s) - '_fila', r.error
+                FROM {staging} s
+                JOIN unnest(%s::bigint[], %s::text[]) AS r(fila, error) ON r.fila = s._fila
+            """, (spec["tabla"], spec["archivo"], [f for f, _ in pares], [e for _, e in pares]))
+            cur.execute(f"DELETE FROM {staging} WHERE _fila = ANY(%s)", ([f for f, _ in pares],))
+
+        cur.execute(f"SELECT _fila FROM {staging} ORDER BY _fila")
+        filas = [r[0] for r in cur.fetchall()]
+        for desde in range(0, len(filas), PAGINA):
+            conteos, rechazadas = cargar_pagina(cur, ejecutar, filas[desde:desde + PAGINA], rechazar)
+            insertadas, actualizadas, sin_cambios = conteos or (0, 0, 0)
+            res["insertadas"] += insertadas
+            res["actualizadas"] += actualizadas
+            res["sin_cambios"] += sin_cambios
+            res["rechazadas"] += rechazadas
+        if sin_resolver_sql:
+            cur.execute(sin_resolver_sql)
+            res["sin_resolver"] = cur.fetchone()[0]
+    return res
+
+def _resumen(spec, res, merge):
+    texto = (f"insertadas {res['insertadas']}, actualizadas {res['actualizadas']}, sin cambios {res['sin_cambios']}"
+             if merge else f"insertadas {res['insertadas']}")
+    if spec.get("referencias"):
+        texto += f", sin resolver {res['sin_resolver']}"
+    if res["rechazadas"]:
+        texto += f", rechazadas {res['rechazadas']} (ver load_rejects)"
+    return texto
+
+def cargar_spec_bulk(conn, spec, merge=False):
+    print(f"Cargando {spec['tabla']} ({'merge' if merge else 'bulk'})...")
+    staging = None
+    try:
+        with conn.cursor() as cur:
+            staging = copiar_a_staging(cur, spec)
+        res = insertar_por_lotes(conn, spec, staging, merge)
+        conn.commit()
+        print(f"{spec['tabla']}: {_resumen(spec, res, merge)}")
+        return res["insertadas"] + res["actualizadas"]
+    except Exception as e:
+        conn.rollback()
+        print(f"[Error] No se pudo cargar {spec['tabla']}: {e}")
+    finally:
+        if staging:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {staging}")
+            conn.commit()
+
+# ============================================
+# Carga en paralelo según las claves foráneas
+# ============================================
+
+# Carga fila a fila: unidad -> (función, tablas que llena)
+CARGAS = {
+    "fuero": (cargar_fuero, ["fuero"]),
+    "jurisdiccion": (cargar_jurisdiccion, ["jurisdiccion"]),
+    "tribunal": (cargar_tribunal, ["tribunal"]),
+    "expediente": (cargar_expediente, ["expediente"]),
+    "parte": (cargar_parte_y_rol, ["parte", "rol_parte"]),
+    "letrado": (cargar_letrado, ["letrado"]),
+    "representacion": (cargar_representacion, ["representacion"]),
+    "resolucion": (cargar_resolucion, ["resolucion"]),
+    "radicacion": (cargar_radicacion, ["radicacion"]),
+    "juez": (cargar_juez, ["juez"]),
+    "tribunal_juez": (cargar_tribunal_juez, ["tribunal_juez"]),
+}
+
+def cargas_bulk(tablas=TABLAS, merge=False):
+    return {spec["tabla"]: (partial(cargar_spec_bulk, spec=spec, merge=merge), [spec["tabla"]]) for spec in tablas}
+
+SQL_FKS = """
+    SELECT conrelid::regclass::text, confrelid::regclass::text
+    FROM pg_constraint
+    WHERE contype = 'f'
+"""
+
+def grafo_fk(fks, unidades):
+    """unidad -> unidades que llenan alguna tabla referenciada por sus claves
+    foráneas; fks son pares (tabla, tabla referenciada) de SQL_FKS"""
+    referencias = defaultdict(set)
+    for hija, madre in fks:
+        referencias[hija].add(madre)
+    duenio = {t: u for u, (_, tablas) in unidades.items() for t in tablas}
+    return {u: sorted({duenio[m] for t in tablas for m in referencias[t] if m in duenio and duenio[m] != u})
+            for u, (_, tablas) in unidades.items()}
+
+def dependencias_fk(conn, unidades):
+    with conn.cursor() as cur:
+        cur.execute(SQL_FKS)
+        return grafo_fk(cur.fetchall(), unidades)
+
+def cargar_en_paralelo(pool, unidades, deps, workers):
+    """Corre cada unidad con su propia conexión del pool apenas terminan sus dependencias"""
+    filas, tiempos = {}, {}
+    pendientes = dict(deps)
+
+    def correr(nombre):
+        conn = pool.getconn()
+        try:
+            t0 = time.perf_counter()
+            res = unidades[nombre][0](conn)
+            return res, time.perf_counter() - t0
+        finally:
+            pool.putconn(conn)
+
+    t0 = time.perf_counter()
+    en_curso = {}
+    with ThreadPoolExecutor(max_workers=workers) as ejecutor:
+        while pendientes or en_curso:
+            listas = [n for n, ds in pendientes.items() if all(d in tiempos for d in ds)]
+            if not listas and not en_curso:
+                raise ValueError(f"Dependencias circulares entre tablas: {sorted(pendientes)}")
+            for n in listas:
+                del pendientes[n]
+                en_curso[ejecutor.submit(correr, n)] = n
+            hechos, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for f in hechos:
+                n = en_curso.pop(f)
+                filas[n], tiempos[n] = f.result()
+    total = time.perf_counter() - t0
+
+    ruta, largo = ruta_critica(deps, tiempos)
+    print("--- Filas y tiempos por tabla ---")
+    for n in sorted(tiempos, key=tiempos.get, reverse=True):
+        print(f"  {n:<16} {'error' if filas[n] is None else filas[n]:>8} {tiempos[n]:7.2f} s")
+    print(f"Ruta crítica: {' -> '.join(ruta)} ({largo:.2f} s)")
+    print(f"Tiempo total: {total:.2f} s con {workers} conexion(es), suma de tablas {sum(tiempos.values()):.2f} s")
+    return filas
+
+# ============================================
+# Manifest de cargas: se saltean las tablas cuyo CSV no cambió
+# ============================================
+
+def huella_archivo(path):
+    """(checksum, filas) del CSV. El checksum incluye la cuarentena del archivo:
+    si cambian las filas excluidas, la tabla se vuelve a cargar"""
+    cuarentena = os.path.join(DIR_CUARENTENA, os.path.basename(path))
+    with open(path, newline="", encoding="utf-8") as f:
+        filas = sum(1 for _ in csv.DictReader(f))
+    return f"{hash_archivo(path)}:{hash_archivo(cuarentena)}", filas
+
+def archivos_de(tablas):
+    return sorted({tabla_spec(t)["archivo"] for t in tablas})
+
+def sin_cambios(conn, unidades, huellas, deps):
+    """Unidades cuyas tablas ya se cargaron con exactamente estos archivos y
+    cuyas dependencias también se saltean. Si se recarga una madre se recargan
+    sus hijas: las filas que antes se rechazaron o quedaron sin resolver por
+    falta de su fila madre (o que --full-reload sacó por huérfanas) se reintentan"""
+    with conn.cursor() as cur:
+        cur.execute("SELECT tabla, archivo, checksum FROM load_manifest")
+        cargadas = {(t, a): c for t, a, c in cur.fetchall()}
+    iguales = {u for u, (_, tablas) in unidades.items()
+               if all(cargadas.get((t, tabla_spec(t)["archivo"])) == huellas[tabla_spec(t)["archivo"]][0]
+                      for t in tablas)}
+    saltear = set()
+    for u in _orden_topologico(deps):
+        if u in iguales and all(d in saltear for d in deps[u]):
+            saltear.add(u)
+    return saltear
+
+def _con_manifest(conn, funcion, tablas, huellas):
+    # Solo una carga sin error queda registrada
+    res = funcion(conn)
+    if res is not None:
+        with conn.cursor() as cur:
+            for t in tablas:
+                archivo = tabla_spec(t)["archivo"]
+                cur.execute("""
+                    INSERT INTO load_manifest (tabla, archivo, checksum, filas, cargado_en)
+                    VALUES (%s, %s, %s, %s, now())
+                    ON CONFLICT (tabla) DO UPDATE
+                    SET archivo = EXCLUDED.archivo, checksum = EXCLUDED.checksum,
+                        filas = EXCLUDED.filas, cargado_en = EXCLUDED.cargado_en
+                """, (t, archivo, *huellas[archivo]))
+        conn.commit()
+    return res
+
+def con_manifest(unidades, huellas):
+    return {u: (partial(_con_manifest, funcion=f, tablas=tablas, huellas=huellas), tablas)
+            for u, (f, tablas) in unidades.items()}
+
+# ============================================
+# Recarga completa (--full-reload)
+# ============================================
+
+SQL_INDICES = """
+    SELECT indexname, tablename, indexdef
+    FROM pg_indexes
+    WHERE schemaname = 'public' AND tablename = ANY(%s)
+      AND indexname NOT IN (SELECT conname FROM pg_constraint)
+"""
+
+SQL_FKS_DETALLE = """
+    SELECT c.conname, c.conrelid::regclass::text, c.confrelid::regclass::text,
+           pg_get_constraintdef(c.oid),
+           ARRAY(SELECT a.attname FROM unnest(c.conkey) WITH ORDINALITY k(n, i)
+                 JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.n ORDER BY k.i),
+           ARRAY(SELECT a.attname FROM unnest(c.confkey) WITH ORDINALITY k(n, i)
+                 JOIN pg_attribute a ON a.attrelid = c.confrelid AND a.attnum = k.n ORDER BY k.i)
+    FROM pg_constraint c
+    WHERE c.contype = 'f' AND c.conrelid::regclass::text = ANY(%s)
+"""
+
+# Tablas fuera de la carga que apuntan (directa o indirectamente) a las que se
+# vacían: TRUNCATE sin CASCADE exige vaciarlas en la misma sentencia
+SQL_DEPENDIENTES = """
+    WITH RECURSIVE hijas(tabla) AS (
+        SELECT unnest(%(tablas)s::text[])
+        UNION
+        SELECT c.conrelid::regclass::text
+        FROM pg_constraint c
+        JOIN hijas h ON c.confrelid::regclass::text = h.tabla
+        WHERE c.contype = 'f'
+    )
+    SELECT tabla FROM hijas WHERE NOT tabla = ANY(%(tablas)s)
+"""
+
+def _orden_topologico(deps):
+    orden, pendientes = [], dict(deps)
+    while pendientes:
+        listas = [n for n, ds in pendientes.items() if all(d in orden for d in ds)]
+        if not listas:
+            raise ValueError(f"Dependencias circulares entre tablas: {sorted(pendientes)}")
+        for n in listas:
+            orden.append(n)
+            del pendientes[n]
+    return orden
+
+def _en_paralelo(pool, trabajos, workers, titulo):
+    """Cada sentencia en su conexión del pool y su transacción, junto con el
+    borrado de su entrada en load_deferred_ddl. Trabajos: (sql, tipo, tabla,
+    nombre). Una que falla no frena a las demás y su entrada queda para la
+    próxima corrida. Devuelve cuántas fallaron"""
+    def correr(trabajo):
+        sql, tipo, tabla, nombre = trabajo
+        conn = pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+                cur.execute("DELETE FROM load_deferred_ddl WHERE tipo = %s AND tabla = %s AND nombre = %s",
+                            (tipo, tabla, nombre))
+            conn.commit()
+            return 0
+        except Exception as e:
+            conn.rollback()
+            print(f"[Error] {sql.strip()}: {str(e).strip()}")
+            return 1
+        finally:
+            pool.putconn(conn)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as ejecutor:
+        fallas = sum(ejecutor.map(correr, trabajos))
+    print(f"{titulo}: {len(trabajos) - fallas} de {len(trabajos)} en {time.perf_counter() - t0:.2f} s")
+    return fallas
+
+def _borrar_huerfanas(cur, fk):
+    """Filas de la tabla hija sin su fila madre: van a load_rejects, así VALIDATE no falla"""
+    nombre, hija, madre, _, cols, cols_madre = fk
+    cruce = " AND ".join(f"m.{cm} = h.{c}" for c, cm in zip(cols, cols_madre))
+    con_valor = " AND ".join(f"h.{c} IS NOT NULL" for c in cols)
+    cur.execute(f"""
+        WITH borradas AS (
+            DELETE FROM {hija} h
+            WHERE {con_valor} AND NOT EXISTS (SELECT 1 FROM {madre} m WHERE {cruce})
+            RETURNING h.*
+        )
+        INSERT INTO load_rejects (tabla, datos, error)
+        SELECT %s, to_jsonb(b), %s FROM borradas b
+    """, (hija, f"sin fila en {madre} ({nombre})"))
+    return cur.rowcount
+
+def restaurar_ddl(pool, workers):
+    """Vuelve a crear los índices y claves foráneas guardados en load_deferred_ddl:
+    los índices en paralelo; las claves primero NOT VALID, sacando las filas
+    huérfanas, y después validadas en paralelo. Cada paso se intenta aunque el
+    anterior haya fallado; lo que falla queda guardado para la próxima corrida.
+    Devuelve cuántos quedaron pendientes"""
+    conn = pool.getconn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT tipo, tabla, nombre, definicion FROM load_deferred_ddl")
+            pendientes = cur.fetchall()
+    finally:
+        pool.putconn(conn)
+    if not pendientes:
+        return 0
+    indices = [(d, t, tabla, n) for t, tabla, n, d in pendientes if t == "indice"]
+    fks = [(t, tabla, n, d) for t, tabla, n, d in pendientes if t == "fk"]
+    fallas = _en_paralelo(pool, indices, workers, "Índices reconstruidos")
+
+    conn = pool.getconn()
+    try:
+        with conn.cursor() as cur:
+            hijas = sorted({hija for _, hija, _, _ in fks})
+            claves = {(hija, nombre) for _, hija, nombre, _ in fks}
+            # Si la caída fue después de agregarla NOT VALID, ya existe
+            cur.execute(SQL_FKS_DETALLE, (hijas,))
+            existentes = {(fk[1], fk[0]) for fk in cur.fetchall()}
+            for _, hija, nombre, definicion in fks:
+                if (hija, nombre) not in existentes:
+                    cur.execute(f"ALTER TABLE {hija} ADD CONSTRAINT {nombre} {definicion} NOT VALID")
+            cur.execute(SQL_FKS_DETALLE, (hijas,))
+            detalle = [fk for fk in cur.fetchall() if (fk[1], fk[0]) in claves]
+            # Madres antes que hijas: lo que se borra en una madre cae en cascada
+            madres = {}
+            for _, hija, madre, *_ in detalle:
+                madres.setdefault(madre, set())
+                madres.setdefault(hija, set()).update({madre} - {hija})
+            orden = _orden_topologico(madres)
+            huerfanas = sum(_borrar_huerfanas(cur, fk) for fk in sorted(detalle, key=lambda fk: orden.index(fk[1])))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"[Error] No se pudieron volver a agregar las claves foráneas: {e}")
+        return fallas + len(fks)
+    finally:
+        pool.putconn(conn)
+    if huerfanas:
+        print(f"Filas sin su fila madre: {huerfanas} (ver load_rejects)")
+    fallas += _en_paralelo(pool, [(f"ALTER TABLE {hija} VALIDATE CONSTRAINT {nombre}", t, hija, nombre)
+                                  for t, hija, nombre, _ in fks], workers, "Claves foráneas validadas")
+    return fallas
+
+def recarga_completa(pool, unidades, deps, workers):
+    """Vacía las tablas, saca índices secundarios y claves foráneas, carga en
+    bloque y recién al final reconstruye los índices (en paralelo) y valida
+    cada clave foránea una sola vez. Las definiciones sacadas quedan en
+    load_deferred_ddl hasta que se restauran, así sobreviven a una caída"""
+    tablas = [t for _, ts in unidades.values() for t in ts]
+    conn = pool.getconn()
+    try:
+        with conn.cursor() as cur:
+            # Las tablas que no vienen del ETL (secretaria, plazo, expediente_delito)
+            # no se recargan: si tienen filas, no se vacían
+            cur.execute(SQL_DEPENDIENTES, {"tablas": tablas})
+            dependientes = sorted(t for (t,) in cur.fetchall())
+            if dependientes:
+                cur.execute(f"LOCK TABLE {', '.join(dependientes)} IN SHARE MODE")
+            con_filas = []
+            for t in dependientes:
+                cur.execute(f"SELECT count(*) FROM {t}")
+                n = cur.fetchone()[0]
+                if n:
+                    con_filas.append(f"{t} ({n} filas)")
+            if con_filas:
+                raise RuntimeError("--full-reload vaciaría tablas que no vienen del ETL y apuntan a las "
+                                   f"que se recargan: {', '.join(con_filas)}. Usar la carga común "
+                                   "(--bulk / --merge) o vaciarlas a mano")
+            cur.execute(SQL_INDICES, (tablas,))
+            indices = cur.fetchall()
+            cur.execute(SQL_FKS_DETALLE, (tablas,))
+            fks = cur.fetchall()
+            cur.execute(f"TRUNCATE {', '.join(tablas + dependientes)} RESTART IDENTITY")
+            execute_values(cur, "INSERT INTO load_deferred_ddl (tipo, tabla, nombre, definicion) VALUES %s",
+                           [("indice", tabla, nombre, definicion) for nombre, tabla, definicion in indices]
+                           + [("fk", hija, nombre, definicion) for nombre, hija, _, definicion, *_ in fks])
+            for nombre, *_ in indices:
+                cur.execute(f"DROP INDEX {nombre}")
+            for nombre, hija, *_ in fks:
+                cur.execute(f"ALTER TABLE {hija} DROP CONSTRAINT {nombre}")
+        conn.commit()
+        print(f"Recarga completa: {len(tablas)} tablas vaciadas, "
+              f"{len(indices)} índices y {len(fks)} claves foráneas fuera durante la carga")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
+
+    try:
+        filas = cargar_en_paralelo(pool, unidades, deps, workers)
+    finally:
+        if restaurar_ddl(pool, workers):
+            print("[Error] Quedaron índices o claves foráneas sin restaurar (ver load_deferred_ddl); "
+                  "se reintentan al comienzo de la próxima carga")
+    return filas
+
 # ============================================
 # Main
 # ============================================
 
 def main():
+    parser = argparse.ArgumentParser(description="Carga de los etl_*.csv a Postgres")
+    parser.add_argument("--bulk", action="store_true",
+                        help="COPY de cada CSV a una tabla staging y un INSERT ... SELECT por tabla "
+                             "(por defecto, inserciones fila a fila)")
+    parser.add_argument("--merge", action="store_true",
+                        help="como --bulk, pero actualiza las filas existentes cuyo contenido cambió "
+                             "(row_hash) e informa insertadas / actualizadas / sin cambios")
+    parser.add_argument("--full-reload", action="store_true",
+                        help="vacía las tablas y las recarga en bloque sin índices secundarios ni claves "
+                             "foráneas; al final reconstruye los índices y valida las claves una vez")
+    parser.add_argument("--force", action="store_true",
+                        help="cargar todas las tablas aunque su CSV no haya cambiado desde la última carga")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="conexiones para cargar en paralelo las tablas que no dependen entre sí "
+                             "(1 = secuencial; por defecto, uno por CPU)")
+    args = parser.parse_args()
+
     print("=== Iniciando carga a base de datos ===")
-    conn = conectar_db()
+    # Las filas inválidas quedan en cuarentena/ en lugar de abortar la tabla
+    validar()
+    en_bloque = args.bulk or args.merge or args.full_reload
+    unidades = cargas_bulk(merge=args.merge) if en_bloque else CARGAS
+    workers = max(1, min(args.workers or os.cpu_count() or 1, len(unidades)))
+    pool = ThreadedConnectionPool(1, workers, **DB_CONFIG)
     try:
-        cargar_fuero(conn)
-        cargar_jurisdiccion(conn)
-        cargar_tribunal(conn)
-        cargar_expediente(conn)
-        cargar_parte_y_rol(conn)
-        cargar_letrado(conn)
-        cargar_representacion(conn)
-        cargar_resolucion(conn)
-        cargar_radicacion(conn)
-        cargar_juez(conn)
-        cargar_tribunal_juez(conn)
+        conn = pool.getconn()
+        try:
+            preparar_base(conn)
+            deps = dependencias_fk(conn, unidades)
+            huellas = {a: huella_archivo(a) for a in archivos_de(t for _, ts in unidades.values() for t in ts)}
+            if args.full_reload:
+                # Se vacían todas las tablas: ninguna carga anterior sigue valiendo
+                with conn.cursor() as cur:
+                    cur.execute("DELETE FROM load_manifest")
+                conn.commit()
+            saltear = set() if args.force or args.full_reload else sin_cambios(conn, unidades, huellas, deps)
+        finally:
+            pool.putconn(conn)
+        # Una recarga completa anterior que se cortó antes de restaurarlos
+        if restaurar_ddl(pool, workers):
+            raise RuntimeError("No se pudieron restaurar los índices y claves foráneas de una recarga "
+                               "completa anterior (ver load_deferred_ddl)")
+        if saltear:
+            print(f"Sin cambios desde la última carga (se saltean): {', '.join(sorted(saltear))}")
+        if len(saltear) == len(unidades):
+            print("=== Nada que cargar (usar --force para recargar igual) ===")
+            return
+        unidades = con_manifest({u: x for u, x in unidades.items() if u not in saltear}, huellas)
+        deps = {u: [d for d in ds if d in unidades] for u, ds in deps.items() if u in unidades}
+        if args.full_reload:
+            recarga_completa(pool, unidades, deps, workers)
+        else:
+            cargar_en_paralelo(pool, unidades, deps, workers)
         print("=== Carga completa (con manejo de errores) ===")
+    except RuntimeError as e:
+        print(f"[Error] {e}")
+        sys.exit(1)
     finally:
-        conn.close()
+        pool.closeall()
 
 if __name__ == "__main__":
     main()
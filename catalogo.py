@@ -0,0 +1,60 @@
+# catalogo.py
+# Catálogo de fuentes del ETL. Cada fuente tiene un esquema declarado (tipos de
+# columnas, opciones de lectura y, si hace falta, un "lector" propio) y se lee
+# una sola vez por proceso: el DataFrame tipado queda en memoria para todas las
+# etapas que lo pidan. Antes de abrir el pool de procesos se precargan las
+# fuentes que usan varias etapas, así los workers (fork) las heredan leídas.
+import os
+
+import pandas as pd
+
+class Catalogo:
+    def __init__(self, esquemas, lector=pd.read_csv, vacio=pd.DataFrame):
+        self.esquemas = esquemas
+        self.lector = lector
+        self.vacio = vacio
+        self._frames = {}
+
+    def _leer(self, path, **kwargs):
+        opciones = dict(self.esquemas.get(os.path.basename(path), {}))
+        lector = opciones.pop("lector", self.lector)
+        return lector(path, **opciones, **kwargs)
+
+    def _existe(self, path):
+        if not os.path.exists(path):
+            print(f"Advertencia: no se encontró el archivo {path}. Se omite.")
+            return False
+        return True
+
+    def leer(self, path):
+        # Frame completo de la fuente (vacío si no existe), leído una sola vez
+        if path not in self._frames:
+            self._frames[path] = self._leer(path) if self._existe(path) else None
+        df = self._frames[path]
+        return self.vacio() if df is None else df
+
+    def bloques(self, path, chunksize=None):
+        # Frames de la fuente. Con chunksize (y si no está ya en memoria) se lee
+        # por partes desde disco y no se guarda nada, para acotar la memoria.
+        if chunksize and path not in self._frames:
+            if self._existe(path):
+                yield from self._leer(path, chunksize=chunksize)
+            return
+        self.leer(path)
+        if self._frames[path] is not None:
+            yield self._frames[path]
+
+    def precargar(self, paths):
+        for p in paths:
+            if os.path.exists(p):
+                self.leer(p)
+
+def compartidas(etapas):
+    # Archivos que leen dos o más etapas
+    vistas, res = set(), []
+    for e in etapas:
+        for x in e["entradas"]:
+            if "." in x and x in vistas and x not in res:
+                res.append(x)
+            vistas.add(x)
+    return res
@@ -0,0 +1,95 @@
+# deltas.py
+# Cambios (CDC) entre dos corridas del ETL. Después de cada corrida se compara
+# cada etl_*.csv con la copia de la corrida anterior (.etl_snapshot/) por su
+# clave natural y se escriben en deltas/ solo las filas insertadas, modificadas
+# o borradas, con una columna "operacion". La comparación es un hash join: un
+# hash de la clave y otro de la fila completa por cada fila, y un merge sobre el
+# hash de la clave, así cuesta lo mismo que leer los dos archivos.
+# Uso: python deltas.py   (también la llama etl_expedientes.py al terminar)
+import os
+import shutil
+
+import pandas as pd
+
+from lectores import leer_csv
+
+DIR_SNAPSHOT = ".etl_snapshot"
+DIR_DELTAS = "deltas"
+
+# Clave de cada salida, la misma de TABLAS en cargar_etl: la natural, o el id
+# estable que el ETL deriva de ella (tribunales, jueces, partes, letrados)
+CLAVES = {
+    "etl_fueros.csv": ["nombre"],
+    "etl_jurisdicciones.csv": ["jurisdiccion_id"],
+    "etl_tribunales.csv": ["tribunal_id"],
+    "etl_expedientes.csv": ["numero_expediente"],
+    "etl_partes.csv": ["parte_id"],
+    "etl_letrados.csv": ["letrado_id"],
+    "etl_representaciones.csv": ["numero_expediente", "parte_id", "letrado_id"],
+    "etl_resoluciones.csv": ["numero_expediente", "fecha", "nombre", "link"],
+    "etl_radicaciones.csv": ["numero_expediente", "orden"],
+    "etl_jueces.csv": ["juez_id"],
+    "etl_tribunal_juez.csv": ["tribunal_id", "juez_id"],
+}
+
+OPERACIONES = ["insert", "update", "delete"]
+
+# =========================
+# Hash join
+# =========================
+
+def _leer(path, clave):
+    # Texto tal cual está en el CSV. Con clave repetida vale la primera fila,
+    # igual que ON CONFLICT DO NOTHING al cargar.
+    df = leer_csv(path, dtype=str, keep_default_na=False)
+    df = df.assign(_clave=pd.util.hash_pandas_object(df[clave], index=False).to_numpy())
+    df = df.drop_duplicates("_clave")
+    return df.assign(_fila=pd.util.hash_pandas_object(df.drop(columns="_clave"), index=False).to_numpy())
+
+def diferencias(anterior, actual, clave):
+    # Filas de actual (insert/update) y de anterior (delete) con su operación
+    nuevo = _leer(actual, clave)
+    if not os.path.exists(anterior):
+        return nuevo.drop(columns=["_clave", "_fila"]).assign(operacion="insert")
+    viejo = _leer(anterior, clave)
+    if list(viejo.columns) != list(nuevo.columns):
+        raise ValueError(f"{actual}: las columnas cambiaron desde la corrida anterior; "
+                         f"borrar {os.path.dirname(anterior)}/ para empezar de cero")
+
+    cruce = viejo[["_clave", "_fila"]].merge(nuevo[["_clave", "_fila"]], on="_clave", how="outer",
+                                             suffixes=("_viejo", "_nuevo"), indicator=True)
+    insertadas = cruce.loc[cruce["_merge"] == "right_only", "_clave"]
+    modificadas = cruce.loc[(cruce["_merge"] == "both") & (cruce["_fila_viejo"] != cruce["_fila_nuevo"]), "_clave"]
+    borradas = cruce.loc[cruce["_merge"] == "left_only", "_clave"]
+
+    partes = [nuevo[nuevo["_clave"].isin(insertadas)].assign(operacion="insert"),
+              nuevo[nuevo["_clave"].isin(modificadas)].assign(operacion="update"),
+              viejo[viejo["_clave"].isin(borradas)].assign(operacion="delete")]
+    return pd.concat(partes, ignore_index=True).drop(columns=["_clave", "_fila"])
+
+# =========================
+# Corrida
+# =========================
+
+def calcular_deltas(claves=CLAVES, snapshot=DIR_SNAPSHOT, destino=DIR_DELTAS):
+    os.makedirs(snapshot, exist_ok=True)
+    os.makedirs(destino, exist_ok=True)
+    res = {}
+    for path, clave in claves.items():
+        if not os.path.exists(path):
+            continue
+        delta = diferencias(os.path.join(snapshot, path), path, clave)
+        delta.to_csv(os.path.join(destino, path), index=False)
+        shutil.copyfile(path, os.path.join(snapshot, path))
+        res[path] = delta["operacion"].value_counts().reindex(OPERACIONES, fill_value=0).to_dict()
+
+    print("--- Deltas contra la corrida anterior ---")
+    for path, n in res.items():
+        if any(n.values()):
+            print(f"  {path:<26} " + ", ".join(f"{op}: {n[op]}" for op in OPERACIONES))
+    if not any(v for n in res.values() for v in n.values()):
+        print("  sin cambios")
+    return res
+
+if __name__ == "__main__":
+    calcular_deltas()
@@ -0,0 +1,195 @@
+# etapas.py
+# Planificador mínimo de etapas del ETL. Cada etapa es un dict:
+#   {"nombre": ..., "funcion": ..., "entradas": [...], "salidas": [...], "retorno": ...}
+# "entradas"/"salidas" son archivos o artefactos en memoria; "retorno" (opcional)
+# es el nombre del artefacto que devuelve la función. Los artefactos en memoria
+# que figuran en "entradas" se pasan como argumentos, en ese orden. "parametros"
+# (opcional) lista opciones de la corrida (p. ej. chunksize) que la etapa recibe
+# como argumentos con nombre.
+# Las etapas que no dependen entre sí corren en paralelo en un pool de procesos.
+# Con un directorio de cache, una etapa cuyas entradas y código no cambiaron
+# desde la corrida anterior se saltea y se reutilizan sus salidas.
+import hashlib
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# =========================
+# Grafo
+# =========================
+
+def dependencias(etapas):
+    # nombre de etapa -> etapas que producen alguna de sus entradas
+    productor = {}
+    for e in etapas:
+        for s in e["salidas"] + ([e["retorno"]] if e.get("retorno") else []):
+            productor[s] = e["nombre"]
+    return {e["nombre"]: sorted({productor[x] for x in e["entradas"]
+                                 if x in productor and productor[x] != e["nombre"]})
+            for e in etapas}
+
+def _argumentos(etapa, artefactos):
+    return [artefactos[x] for x in etapa["entradas"] if x in artefactos]
+
+def _opciones(etapa, parametros):
+    return {k: parametros[k] for k in etapa.get("parametros", []) if k in parametros}
+
+# =========================
+# Cache (manifest de huellas)
+# =========================
+
+def hash_archivo(path):
+    if not os.path.exists(path):
+        return "ausente"
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+def huellas(etapas, deps, version):
+    # Huella de cada etapa: versión del código + hash de sus archivos de entrada
+    # + huellas de las etapas que le pasan artefactos en memoria
+    productor = {e["retorno"]: e["nombre"] for e in etapas if e.get("retorno")}
+    por_nombre = {e["nombre"]: e for e in etapas}
+    res = {}
+    pendientes = dict(deps)
+    while pendientes:
+        for n, ds in list(pendientes.items()):
+            if all(d in res for d in ds):
+                h = hashlib.sha256(f"{version}|{n}".encode())
+                for x in por_nombre[n]["entradas"]:
+                    h.update(f"|{x}={res[productor[x]] if x in productor else hash_archivo(x)}".encode())
+                res[n] = h.hexdigest()
+                del pendientes[n]
+    return res
+
+def _leer_manifest(cache):
+    path = os.path.join(cache, "manifest.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def _guardar_manifest(cache, manifest):
+    with open(os.path.join(cache, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+def _path_artefacto(cache, nombre):
+    return os.path.join(cache, f"{nombre}.pkl")
+
+def _vigente(etapa, huella, manifest, cache):
+    if manifest.get(etapa["nombre"]) != huella:
+        return False
+    salidas = list(etapa["salidas"])
+    if etapa.get("retorno"):
+        salidas.append(_path_artefacto(cache, etapa["retorno"]))
+    return all(os.path.exists(s) for s in salidas)
+
+def _correr(funcion, args, kwargs=None):
+    t0 = time.perf_counter()
+    res = funcion(*args, **(kwargs or {}))
+    return res, time.perf_counter() - t0
+
+def ruta_critica(deps, tiempos):
+    # Camino más largo (en segundos) del grafo, usando los tiempos medidos
+    fin, previa = {}, {}
+    pendientes = dict(deps)
+    while pendientes:
+        for n, ds in list(pendientes.items()):
+            if all(d in fin for d in ds):
+                previa[n] = max(ds, key=lambda d: fin[d]) if ds else None
+                fin[n] = tiempos.get(n, 0.0) + (fin[previa[n]] if ds else 0.0)
+                del pendientes[n]
+    n = max(fin, key=fin.get)
+    ruta = []
+    while n:
+        ruta.append(n)
+        n = previa[n]
+    return list(reversed(ruta)), max(fin.values())
+
+# =========================
+# Ejecución
+# =========================
+
+def ejecutar(etapas, workers=None, cache=None, version="", forzar=False, parametros=None, contexto=None):
+    workers = workers or os.cpu_count() or 1
+    deps = dependencias(etapas)
+    por_nombre = {e["nombre"]: e for e in etapas}
+    artefactos, tiempos = {}, {}
+    parametros = parametros or {}
+    pendientes = dict(deps)
+
+    manifest, huella, salteadas = {}, {}, []
+    if cache:
+        os.makedirs(cache, exist_ok=True)
+        manifest = {} if forzar else _leer_manifest(cache)
+        huella = huellas(etapas, deps, version)
+
+    def listas():
+        res = [n for n, ds in pendientes.items() if all(d in tiempos for d in ds)]
+        if pendientes and not res and not en_curso:
+            raise ValueError(f"Dependencias circulares entre etapas: {sorted(pendientes)}")
+        return res
+
+    def terminar(nombre, res, seg):
+        tiempos[nombre] = seg
+        ret = por_nombre[nombre].get("retorno")
+        if ret:
+            artefactos[ret] = res
+        if cache:
+            if ret:
+                with open(_path_artefacto(cache, ret), "wb") as f:
+                    pickle.dump(res, f, protocol=pickle.HIGHEST_PROTOCOL)
+            manifest[nombre] = huella[nombre]
+            _guardar_manifest(cache, manifest)
+
+    def reutilizar():
+        # Etapas listas cuya huella coincide con el manifest: no se corren
+        while cache:
+            vigentes = [n for n in listas() if _vigente(por_nombre[n], huella[n], manifest, cache)]
+            if not vigentes:
+                return
+            for n in vigentes:
+                del pendientes[n]
+                ret = por_nombre[n].get("retorno")
+                if ret:
+                    with open(_path_artefacto(cache, ret), "rb") as f:
+                        artefactos[ret] = pickle.load(f)
+                tiempos[n] = 0.0
+                salteadas.append(n)
+
+    en_curso = {}
+    t0 = time.perf_counter()
+    if workers == 1:
+        while pendientes:
+            reutilizar()
+            for n in listas():
+                del pendientes[n]
+                e = por_nombre[n]
+                terminar(n, *_correr(e["funcion"], _argumentos(e, artefactos), _opciones(e, parametros)))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=contexto) as pool:
+            while pendientes or en_curso:
+                reutilizar()
+                if not pendientes and not en_curso:
+                    break
+                for n in listas():
+                    del pendientes[n]
+                    e = por_nombre[n]
+                    en_curso[pool.submit(_correr, e["funcion"], _argumentos(e, artefactos),
+                                         _opciones(e, parametros))] = n
+                hechos, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                for f in hechos:
+                    terminar(en_curso.pop(f), *f.result())
+    total = time.perf_counter() - t0
+
+    ruta, largo = ruta_critica(deps, tiempos)
+    print("--- Tiempos por etapa ---")
+    for n in sorted(tiempos, key=tiempos.get, reverse=True):
+        print(f"  {n:<16} {'(sin cambios, cache)' if n in salteadas else f'{tiempos[n]:7.2f} s'}")
+    print(f"Ruta crítica: {' -> '.join(ruta)} ({largo:.2f} s)")
+    print(f"Tiempo total: {total:.2f} s con {workers} worker(s), suma de etapas {sum(tiempos.values()):.2f} s")
+    return artefactos
@@ -1,11 +1,25 @@
 # 5_etl_expedientes.py
+import argparse
 import csv
+import json
+import multiprocessing
 import re
 import os
-import unicodedata
+from collections import defaultdict
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
+import catalogo
+import etapas
+import lectores
+import normalizacion
+from catalogo import Catalogo, compartidas
+from deltas import calcular_deltas
+from etapas import ejecutar, hash_archivo
+from lectores import leer_csv
+from normalizacion import clave_compuesta, claves_nombre, claves_serie, ids_serie
+
 # =========================
 # Diccionarios de normalización
 # =========================
@@ -62,7 +76,22 @@ def limpiar_texto(texto):
     s = " ".join(str(texto).split())
     return s if s != "" else None
 
-def parse_date(fecha_str):
+def limpiar_serie(serie):
+    # Versión vectorizada de limpiar_texto (None -> None, NaN -> "nan" como str())
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Se limpia cada categoría una sola vez y se reusan los códigos;
+        # el código -1 (faltante) cae en el último elemento, "nan"
+        limpias = limpiar_serie(pd.Series(serie.cat.categories, dtype=object)).tolist() + ["nan"]
+        codigos, categorias = pd.factorize(pd.Series(limpias, dtype=object))
+        cat = pd.Categorical.from_codes(codigos[serie.cat.codes.to_numpy()], categorias)
+        return pd.Series(cat, index=serie.index, name=serie.name)
+    s = serie.astype(object)
+    es_none = pd.Series(np.equal(s.to_numpy(), None), index=s.index)
+    s = s.where(s.notna() | es_none, "nan").where(~es_none, "")
+    s = s.astype(str).str.split().str.join(" ").astype(object)
+    return s.where(s != "", None)
+
+def _parse_date(fecha_str):
     if not fecha_str:
         return ""
     try:
@@ -70,17 +99,91 @@ def parse_date(fecha_str):
     except Exception:
         return ""
 
-def safe_read_csv_pd(path):
+# Las mismas fechas se repiten miles de veces: cada valor se parsea una sola vez
+_cache_fechas = {}
+
+def parse_date(fecha_str):
+    try:
+        return _cache_fechas[fecha_str]
+    except KeyError:
+        res = _cache_fechas[fecha_str] = _parse_date(fecha_str)
+        return res
+    except TypeError:
+        return _parse_date(fecha_str)
+
+def convertir_fechas(serie):
+    # dd/mm/aaaa -> aaaa-mm-dd sobre los valores únicos; inválidas -> ""
+    valores = serie.astype(object)
+    unicos = pd.Index(valores[valores.notna()].unique(), dtype=object)
+    fechas = pd.to_datetime(unicos.astype(str).str.strip(), format="%d/%m/%Y", errors="coerce")
+    res = pd.Series(fechas.strftime("%Y-%m-%d"), index=unicos, dtype=object)
+    # Lo que pandas no resuelve (o años < 1000, que strftime formatea distinto)
+    # pasa por parse_date para conservar exactamente el mismo resultado
+    dudosas = fechas.isna() | (fechas.year < 1000)
+    res[dudosas] = [parse_date(v) for v in unicos[dudosas]]
+    return valores.map(res).fillna("").astype(object)
+
+# Tipos declarados de cada fuente. Las columnas que repiten pocos valores
+# largos (roles, estados, juzgados, fiscalías, fechas) se leen como
+# categóricas; las columnas no listadas, como str.
+def _tipos(**cols):
+    return defaultdict(lambda: str, cols)
+
+_TIPOS_EXPEDIENTES = _tipos(**{"Delitos": "category", "Estado": "category", "Estado_General": "category",
+                               "Última actualización": "category"})
+_TIPOS_INTERVINIENTES = _tipos(Expediente="category", Rol="category", Letrado="category")
+_TIPOS_RESOLUCIONES = _tipos(Expediente="category", Fecha="category", Nombre="category")
+_TIPOS_RADICACIONES = _tipos(Expediente="category", Orden="Int64", Fecha="category", Juzgado="category",
+                             Fiscal="category", Fiscalia="category", **{"Fiscalía": "category"})
+
+def filtrar_vistas(df, vistos, subset=None):
+    # Saca filas repetidas (en las columnas de subset, o en todas) dentro del
+    # bloque o ya vistas en bloques anteriores. vistos guarda un hash de 64
+    # bits por fila única, no la fila entera.
+    if df.empty:
+        return df
+    h = pd.util.hash_pandas_object(df[subset] if subset else df, index=False).to_numpy()
+    nuevas = ~pd.Series(h).duplicated().to_numpy()
+    nuevas &= np.fromiter((x not in vistos for x in h.tolist()), dtype=bool, count=len(h))
+    vistos.update(h[nuevas].tolist())
+    return df[nuevas]
+
+def escribir_csv(df, path, nuevo=False, **kwargs):
+    # nuevo=True crea el archivo con encabezado; si no, agrega filas al final
+    df.to_csv(path, mode="w" if nuevo else "a", header=nuevo, index=False, **kwargs)
+
+def primera_col(df, *cols):
+    # Equivale a row.get(a) or row.get(b) or ... sobre columnas enteras
+    res = None
+    for c in cols:
+        v = df[c].astype(object) if c in df.columns else pd.Series(None, index=df.index, dtype=object)
+        res = v if res is None else res.where(res.notna() & (res != ""), v)
+    return res.where(res.notna(), None)
+
+def safe_read_jsonl_pd(path):
     if not os.path.exists(path):
-        print(f"Advertencia: no se encontró el archivo {path}. Se omite.")
         return pd.DataFrame()
-    return pd.read_csv(path)
+    with open(path, encoding="utf-8") as f:
+        return pd.DataFrame([json.loads(l) for l in f if l.strip()])
+
+# Como csv.DictReader: celdas vacías como ""
+COMO_TEXTO = {"keep_default_na": False}
+
+# Esquema declarado de cada fuente (ver catalogo.py)
+ESQUEMAS = {
+    "5_expedientes.csv": {"dtype": _TIPOS_EXPEDIENTES, **COMO_TEXTO},
+    "scraper_completas_terminadas_expedientes.csv": {"dtype": _TIPOS_EXPEDIENTES, **COMO_TEXTO},
+    "5_intervinientes.csv": {"dtype": _TIPOS_INTERVINIENTES},
+    "scraper_completas_terminadas_intervinientes.csv": {"dtype": _TIPOS_INTERVINIENTES},
+    "5_resoluciones.csv": {"dtype": _TIPOS_RESOLUCIONES, **COMO_TEXTO},
+    "scraper_completas_terminadas_resoluciones.csv": {"dtype": _TIPOS_RESOLUCIONES, **COMO_TEXTO},
+    "5_radicaciones.csv": {"dtype": _TIPOS_RADICACIONES},
+    "scraper_completas_terminadas_radicaciones.csv": {"dtype": _TIPOS_RADICACIONES},
+    "tribunales_full.csv": {"dtype": _tipos(nivel="Int64")},
+    "tribunales_full.jsonl": {"lector": safe_read_jsonl_pd},
+}
 
-def safe_open(path, mode, **kwargs):
-    if not os.path.exists(path) and "r" in mode:
-        print(f"Advertencia: no se encontró el archivo {path}. Se omite.")
-        return None
-    return open(path, mode, **kwargs)
+CATALOGO = Catalogo(ESQUEMAS, lector=leer_csv)
 
 # =========================
 # Funciones auxiliares de inferencia
@@ -124,141 +227,183 @@ def desarmar_radicacion(radicacion):
             fiscalia = p.split(":", 1)[-1].strip() if ":" in p else p.strip()
     return fecha, tribunal, fiscal, fiscalia
 
+# --- Versiones vectorizadas (mismas reglas, columnas enteras) ---
+
+def inferir_fuero_serie(numeros):
+    sigla = numeros.str.split().str[0].str.upper()
+    return sigla.map(FUERO_POR_CAMARA).fillna("Desconocido").astype(object)
+
+def inferir_jurisdiccion_serie(radicaciones):
+    es_fed = radicaciones.str.upper().str.contains("FEDERAL", regex=False, na=False)
+    return pd.Series(np.where(es_fed, "Federal", "Nacional"), index=radicaciones.index, dtype=object)
+
+def extraer_camara_y_ano_serie(numeros):
+    m = numeros.str.extract(r"^(\w+)\s+\d+/(\d{4})")
+    camara = m[0].str.upper().map(CAMARAS).fillna("Desconocida").astype(object)
+    return camara, pd.to_numeric(m[1]).astype("Int64")
+
+def desarmar_radicacion_serie(radicaciones):
+    partes = radicaciones.fillna("").str.split("|", expand=True)
+    partes = partes.apply(lambda c: c.str.strip())
+    vacio = pd.Series("", index=radicaciones.index, dtype=object)
+    fecha = partes[0].fillna("").astype(object)
+    tribunal = partes[1].fillna("").astype(object) if 1 in partes.columns else vacio
+    fiscal, fiscalia = vacio, vacio
+    for c in partes.columns[2:]:
+        p = partes[c]
+        up = p.str.upper()
+        despues = p.str.split(":", n=1).str[-1].str.strip()
+        es_fiscal = up.str.startswith("FISCAL:", na=False)
+        es_fiscalia = ~es_fiscal & (up.str.startswith("FISCALIA", na=False) | up.str.startswith("FISCALÍA", na=False))
+        fiscal = despues.where(es_fiscal, fiscal)
+        fiscalia = despues.where(p.str.contains(":", regex=False, na=False), p).where(es_fiscalia, fiscalia)
+    return pd.DataFrame({"fecha": fecha, "tribunal": tribunal, "fiscal": fiscal, "fiscalia": fiscalia})
+
 # =========================
 # 1) EXPEDIENTES
 # =========================
 
-def procesar_expedientes():
+def _expedientes_desde(df, estado):
+    numero = limpiar_serie(primera_col(df, "Expediente", "numero_expediente"))
+    radicacion = primera_col(df, "Radicación del expediente").where(lambda r: r.notna() & (r != ""), "")
+    rad = desarmar_radicacion_serie(radicacion)
+    camara, ano_inicio = extraer_camara_y_ano_serie(numero)
+    exp = pd.DataFrame({
+        "numero_expediente": numero,
+        "caratula": limpiar_serie(primera_col(df, "Carátula", "caratula")),
+        "jurisdiccion": inferir_jurisdiccion_serie(radicacion),
+        "tribunal": limpiar_serie(rad["tribunal"]),
+        "estado_procesal": estado,
+        "fecha_inicio": convertir_fechas(rad["fecha"]),
+        "fecha_ultimo_movimiento": convertir_fechas(limpiar_serie(primera_col(df, "Última actualización", "fecha_ultimo_mov"))),
+        "camara_origen": camara,
+        "ano_inicio": ano_inicio,
+        "delitos": limpiar_serie(primera_col(df, "Delitos", "delitos")),
+        "fiscal": limpiar_serie(rad["fiscal"]),
+        "fiscalia": limpiar_serie(rad["fiscalia"]),
+        "fuero": inferir_fuero_serie(numero)
+    })
+    return exp.astype(dict.fromkeys(CATEGORICAS_EXP, "category"))
+
+# Columnas de expedientes con pocos valores distintos
+CATEGORICAS_EXP = ["jurisdiccion", "tribunal", "estado_procesal", "camara_origen", "fiscalia", "fuero"]
+
+def procesar_expedientes(chunksize=None):
     print("Procesando expedientes...")
-    f_tramite = safe_open("5_expedientes.csv", "r", newline="", encoding="utf-8")
-    f_term = safe_open("scraper_completas_terminadas_expedientes.csv", "r", newline="", encoding="utf-8")
-
-    rows = []
-    count_tramite = count_term = 0
-
-    def procesar_reader(reader, estado_id):
-        nonlocal rows, count_tramite, count_term
-        for row in reader:
-            numero = limpiar_texto(row.get("Expediente") or row.get("numero_expediente"))
-            caratula = limpiar_texto(row.get("Carátula") or row.get("caratula"))
-            ultima_act = limpiar_texto(row.get("Última actualización") or row.get("fecha_ultimo_mov"))
-            radicacion = row.get("Radicación del expediente") or ""
-            delitos = limpiar_texto(row.get("Delitos") or row.get("delitos"))
-            fecha_inicio, tribunal, fiscal, fiscalia = desarmar_radicacion(radicacion)
-            camara, ano_inicio = extraer_camara_y_ano(numero)
-            fuero = inferir_fuero_por_camara(numero)
-            jurisdiccion = inferir_jurisdiccion_por_radicacion(radicacion)
-            rows.append({
-                "numero_expediente": numero,
-                "caratula": caratula,
-                "jurisdiccion": jurisdiccion,
-                "tribunal": limpiar_texto(tribunal),
-                "estado_procesal": "En trámite" if estado_id == 1 else "Terminada",
-                "fecha_inicio": parse_date(fecha_inicio),
-                "fecha_ultimo_movimiento": parse_date(ultima_act),
-                "camara_origen": camara,
-                "ano_inicio": ano_inicio,
-                "delitos": delitos,
-                "fiscal": limpiar_texto(fiscal),
-                "fiscalia": limpiar_texto(fiscalia),
-                "fuero": fuero
-            })
-            if estado_id == 1: count_tramite += 1
-            else: count_term += 1
-
-    if f_tramite: 
-        with f_tramite as f: procesar_reader(csv.DictReader(f), 1)
-    if f_term: 
-        with f_term as f: procesar_reader(csv.DictReader(f), 2)
-
-    print(f"Expedientes en trámite: {count_tramite}, terminados: {count_term}")
-
+    fuentes = [("5_expedientes.csv", "En trámite"),
+               ("scraper_completas_terminadas_expedientes.csv", "Terminada")]
     fieldnames = [
         "numero_expediente","caratula","jurisdiccion","tribunal","estado_procesal",
         "fecha_inicio","fecha_ultimo_movimiento","camara_origen","ano_inicio",
         "delitos","fiscal","fiscalia"
     ]
-    with open("etl_expedientes.csv","w",newline="",encoding="utf-8") as f_out:
-        writer=csv.DictWriter(f_out,fieldnames=fieldnames)
-        writer.writeheader()
-        for r in rows:
-            writer.writerow({k:r.get(k) for k in fieldnames})
-    return pd.DataFrame(rows)
+    dims = ["tribunal", "fuero", "jurisdiccion"]
+
+    escribir_csv(pd.DataFrame(columns=fieldnames), "etl_expedientes.csv", nuevo=True, lineterminator="\r\n")
+    conteo = {}
+    vistas = [pd.DataFrame(columns=dims)]
+    for path, estado in fuentes:
+        conteo[estado] = 0
+        for df in CATALOGO.bloques(path, chunksize):
+            exp = _expedientes_desde(df, estado)
+            escribir_csv(exp[fieldnames], "etl_expedientes.csv", lineterminator="\r\n")
+            conteo[estado] += len(exp)
+            vistas.append(exp[dims].drop_duplicates(keep="last"))
+
+    print(f"Expedientes en trámite: {conteo['En trámite']}, terminados: {conteo['Terminada']}")
+
+    # Para las dimensiones alcanza con la última combinación de cada tribunal
+    vistas = pd.concat(vistas, ignore_index=True).drop_duplicates(keep="last").reset_index(drop=True)
+    return vistas.astype("category")
 
 # =========================
 # 2) PARTES / LETRADOS / REPRESENTACIONES
 # =========================
 
-def procesar_intervinientes():
+def procesar_intervinientes(chunksize=None):
     print("Procesando intervinientes...")
-    df_t=safe_read_csv_pd("5_intervinientes.csv")
-    df_T=safe_read_csv_pd("scraper_completas_terminadas_intervinientes.csv")
-    for df in (df_t,df_T):
-        if df.empty: continue
-        rename={"Expediente":"numero_expediente","Nombre":"nombre","Rol":"rol","Letrado":"letrado"}
-        for k,v in rename.items():
-            if k in df.columns: df.rename(columns={k:v},inplace=True)
-        for c in ["numero_expediente","nombre","rol","letrado"]:
-            if c in df.columns: df[c]=df[c].map(limpiar_texto)
-    df_all=pd.concat([df_t,df_T],ignore_index=True)
-    partes=df_all.dropna(subset=["numero_expediente","nombre"])[["numero_expediente","nombre","rol"]].drop_duplicates()
-    partes.to_csv("etl_partes.csv",index=False)
-    letrados=df_all.dropna(subset=["numero_expediente","nombre","letrado"]).rename(columns={"nombre":"interviniente"})[["numero_expediente","interviniente","letrado"]].drop_duplicates()
-    letrados.to_csv("etl_letrados.csv",index=False)
-    reprs=df_all.dropna(subset=["numero_expediente","nombre","letrado"]).rename(columns={"nombre":"nombre_parte"})[["numero_expediente","nombre_parte","letrado","rol"]].drop_duplicates()
-    reprs.to_csv("etl_representaciones.csv",index=False)
-    print(f"Partes:{len(partes)}, Letrados:{len(letrados)}, Representaciones:{len(reprs)}")
+    rename={"Expediente":"numero_expediente","Nombre":"nombre","Rol":"rol","Letrado":"letrado"}
+    salidas={
+        "etl_partes.csv":["parte_id","numero_expediente","nombre","rol"],
+        "etl_letrados.csv":["letrado_id","nombre"],
+        "etl_representaciones.csv":["numero_expediente","parte_id","letrado_id","rol"],
+    }
+    # Ids estables: parte = (expediente, nombre normalizado, rol); letrado =
+    # nombre normalizado. Con variantes del mismo nombre queda la primera
+    registros={"parte":{},"letrado":{}}
+    vistos={k:set() for k in salidas}
+    total=dict.fromkeys(salidas,0)
+    for path_out,cols in salidas.items():
+        escribir_csv(pd.DataFrame(columns=cols),path_out,nuevo=True)
+
+    for path in ("5_intervinientes.csv","scraper_completas_terminadas_intervinientes.csv"):
+        for df in CATALOGO.bloques(path,chunksize):
+            df=df.rename(columns=rename)
+            for c in ["numero_expediente","nombre","rol","letrado"]:
+                if c in df.columns: df[c]=limpiar_serie(df[c])
+            partes=df.dropna(subset=["numero_expediente","nombre"])
+            partes=partes.assign(parte_id=ids_serie(
+                clave_compuesta(partes["numero_expediente"],claves_nombre(partes["nombre"]),partes["rol"]),registros["parte"]))
+            con_letrado=partes.dropna(subset=["letrado"])
+            con_letrado=con_letrado.assign(letrado_id=ids_serie(
+                claves_nombre(con_letrado["letrado"]),registros["letrado"]))
+            bloques={
+                "etl_partes.csv":partes,
+                "etl_letrados.csv":con_letrado[["letrado_id","letrado"]].rename(columns={"letrado":"nombre"}),
+                "etl_representaciones.csv":con_letrado,
+            }
+            for path_out,cols in salidas.items():
+                nuevas=filtrar_vistas(bloques[path_out][cols],vistos[path_out],subset=cols[:1] if path_out!="etl_representaciones.csv" else None)
+                escribir_csv(nuevas,path_out)
+                total[path_out]+=len(nuevas)
+    print(f"Partes:{total['etl_partes.csv']}, Letrados:{total['etl_letrados.csv']}, Representaciones:{total['etl_representaciones.csv']}")
 
 # =========================
 # 3) RESOLUCIONES
 # =========================
 
-def procesar_resoluciones():
+def procesar_resoluciones(chunksize=None):
     print("Procesando resoluciones...")
-    f_t=safe_open("5_resoluciones.csv","r",encoding="utf-8")
-    f_T=safe_open("scraper_completas_terminadas_resoluciones.csv","r",encoding="utf-8")
-    out=[]; seen=set()
-    def process(reader):
-        for r in reader:
-            exp=limpiar_texto(r.get("Expediente")or r.get("numero_expediente"))
-            if not exp: continue
-            fecha=parse_date(r.get("Fecha")or r.get("fecha"))
-            nom=limpiar_texto(r.get("Nombre")or r.get("nombre"))
-            link=limpiar_texto(r.get("Link")or r.get("link"))
-            key=(exp,fecha,nom,link)
-            if key not in seen:
-                seen.add(key)
-                out.append({"numero_expediente":exp,"fecha":fecha,"nombre":nom,"link":link})
-    if f_t: process(csv.DictReader(f_t))
-    if f_T: process(csv.DictReader(f_T))
-    with open("etl_resoluciones.csv","w",newline="",encoding="utf-8") as f:
-        writer=csv.DictWriter(f,fieldnames=["numero_expediente","fecha","nombre","link"])
-        writer.writeheader(); writer.writerows(out)
-    print(f"Resoluciones combinadas: {len(out)}")
+    cols = ["numero_expediente", "fecha", "nombre", "link"]
+    escribir_csv(pd.DataFrame(columns=cols), "etl_resoluciones.csv", nuevo=True, lineterminator="\r\n")
+    vistos, total = set(), 0
+    for path in ("5_resoluciones.csv", "scraper_completas_terminadas_resoluciones.csv"):
+        for df in CATALOGO.bloques(path, chunksize):
+            out = pd.DataFrame({
+                "numero_expediente": limpiar_serie(primera_col(df, "Expediente", "numero_expediente")),
+                "fecha": convertir_fechas(primera_col(df, "Fecha", "fecha")),
+                "nombre": limpiar_serie(primera_col(df, "Nombre", "nombre")),
+                "link": limpiar_serie(primera_col(df, "Link", "link"))
+            })
+            out = filtrar_vistas(out[out["numero_expediente"].notna()], vistos)
+            escribir_csv(out, "etl_resoluciones.csv", lineterminator="\r\n")
+            total += len(out)
+    print(f"Resoluciones combinadas: {total}")
 
 # =========================
 # 4) RADICACIONES
 # =========================
 
-def procesar_radicaciones():
+def procesar_radicaciones(chunksize=None):
     print("Procesando radicaciones...")
-    df_t=safe_read_csv_pd("5_radicaciones.csv")
-    df_T=safe_read_csv_pd("scraper_completas_terminadas_radicaciones.csv")
-    df=pd.concat([df_t,df_T],ignore_index=True)
     ren={"Expediente":"numero_expediente","Orden":"orden","Fecha":"fecha_radicacion",
          "Tribunal":"tribunal","Fiscal":"fiscal_nombre","Fiscalía":"fiscalia","Fiscalia":"fiscalia"}
-    for k,v in ren.items():
-        if k in df.columns: df.rename(columns={k:v},inplace=True)
-    for c in ["numero_expediente","tribunal","fiscal_nombre","fiscalia"]:
-        if c in df.columns: df[c]=df[c].map(limpiar_texto)
-    if "fecha_radicacion" in df.columns:
-        df["fecha_radicacion"]=df["fecha_radicacion"].map(parse_date)
     keep=["numero_expediente","orden","fecha_radicacion","tribunal","fiscal_nombre","fiscalia"]
-    for k in keep:
-        if k not in df.columns: df[k]=None
-    df=df[keep].dropna(subset=["numero_expediente"]).drop_duplicates()
-    df.to_csv("etl_radicaciones.csv",index=False)
-    print(f"Radicaciones combinadas: {len(df)}")
+    escribir_csv(pd.DataFrame(columns=keep),"etl_radicaciones.csv",nuevo=True)
+    vistos,total=set(),0
+    for path in ("5_radicaciones.csv","scraper_completas_terminadas_radicaciones.csv"):
+        for df in CATALOGO.bloques(path,chunksize):
+            df=df.rename(columns=ren)
+            for c in ["numero_expediente","tribunal","fiscal_nombre","fiscalia"]:
+                if c in df.columns: df[c]=limpiar_serie(df[c])
+            if "fecha_radicacion" in df.columns:
+                df["fecha_radicacion"]=convertir_fechas(df["fecha_radicacion"])
+            for k in keep:
+                if k not in df.columns: df[k]=None
+            df=filtrar_vistas(df[keep].dropna(subset=["numero_expediente"]),vistos)
+            escribir_csv(df,"etl_radicaciones.csv")
+            total+=len(df)
+    print(f"Radicaciones combinadas: {total}")
 
 # =========================
 # 5) Dimensiones: FUEROS / JURISDICCIONES
@@ -284,281 +429,351 @@ def generar_dim_jurisdicciones(df):
 # 6) Dimensión Tribunales + Jueces (nueva versión)
 # =========================
 
-def _strip_accents(s):
-    if s is None: return None
-    s = str(s)
-    nf = unicodedata.normalize('NFD', s)
-    return ''.join(ch for ch in nf if unicodedata.category(ch) != 'Mn')
-
-def _norm(s):
-    if s is None: return None
-    s=_strip_accents(s).lower()
-    s=re.sub(r'[^a-z0-9\s]',' ',s)
-    return re.sub(r'\s+',' ',s).strip() or None
-
-def _es_dependencia(t):
-    return t and (t.startswith('sala ') or t.startswith('secretaria') or 'jurisprudencia' in t)
-
-def _tribunal_desde_path(path):
-    if not path: return None
-    parts=[p.strip() for p in str(path).split('>') if p.strip()]
-    if not parts: return None
-    last=parts[-1]
-    if 'sala' in _norm(last) or 'secretaria' in _norm(last):
-        return parts[-2] if len(parts)>1 else last
-    return last
-
-def generar_dim_tribunales(df, path="tribunales_full.csv"):
+def _es_dependencia_serie(t):
+    return (t.str.startswith("sala ", na=False) | t.str.startswith("secretaria", na=False)
+            | t.str.contains("jurisprudencia", regex=False, na=False))
+
+def _tribunal_desde_path_serie(paths):
+    # Último tramo del path; si es una sala/secretaría, el tramo anterior
+    partes = paths.str.split(">").explode().str.strip()
+    partes = partes[partes.notna() & (partes != "")]
+    g = partes.groupby(level=0)
+    ultimo = g.nth(-1)
+    anteultimo = g.nth(-2).reindex(ultimo.index)
+    ult_norm = claves_serie(ultimo)
+    es_sub = (ult_norm.str.contains("sala", regex=False, na=False)
+              | ult_norm.str.contains("secretaria", regex=False, na=False))
+    padre = ultimo.where(~(es_sub & anteultimo.notna()), anteultimo)
+    return padre.reindex(paths.index)
+
+def _pick_col(df, *cands):
+    # Busca columnas con nombres parecidos
+    for c in df.columns:
+        for cand in cands:
+            if cand in c.lower():
+                return c
+    return None
+
+def _col_texto(df, col):
+    # str(x).strip() por celda, None si falta la columna o el valor
+    if not col:
+        return pd.Series(None, index=df.index, dtype=object)
+    v = df[col]
+    return v.astype(str).str.strip().astype(object).where(v.notna(), None)
+
+def _nombre_tribunal_guia(df, col_t, col_p):
+    # Las dependencias (salas, secretarías) se asignan al tribunal padre del path
+    titulo = df[col_t].astype(str).str.strip().astype(object)
+    padre = _tribunal_desde_path_serie(_col_texto(df, col_p))
+    usar_padre = _es_dependencia_serie(claves_serie(titulo)) & padre.notna()
+    return titulo.where(~usar_padre, padre)
+
+def leer_guia(path="tribunales_full.csv", path_jsonl="tribunales_full.jsonl"):
+    # El JSONL (con integrantes anidados) tiene prioridad sobre el CSV aplanado
+    if os.path.exists(path_jsonl):
+        df = CATALOGO.leer(path_jsonl)
+        if not df.empty:
+            return df
+    return CATALOGO.leer(path)
+
+def _magistrado_desde_integrante(it):
+    ficha = it.get("ficha") or {}
+    nombre = limpiar_texto(it.get("nombre"))
+    cargo = limpiar_texto(it.get("cargo"))
+    # El teléfono de la ficha es el real; el de la tarjeta a veces trae el nombre
+    tel = limpiar_texto(ficha.get("Teléfono")) or limpiar_texto(it.get("telefono"))
+    if tel and nombre and nombre in tel:
+        tel = None
+    email = None
+    for e in (limpiar_texto(it.get("correo")), limpiar_texto(ficha.get("Email"))):
+        if e and "@" in e:
+            email = e
+            break
+    return {
+        "nombre": nombre,
+        "cargo": cargo,
+        "telefono": tel,
+        "email": email,
+        "situacion": limpiar_texto(ficha.get("Situación"))
+    }
+
+def generar_dim_tribunales(df, path="tribunales_full.csv", path_jsonl="tribunales_full.jsonl"):
     print("Extrayendo tribunales (con jerarquía)...")
-    tribunales = {}
-
-    # --- Desde los expedientes ---
-    for _, r in df.iterrows():
-        n = limpiar_texto(r.get("tribunal"))
-        if n:
-            tribunales[_norm(n)] = {
-                "nombre": n,
-                "instancia": "Primera Instancia",
-                "fuero": r.get("fuero"),
-                "jurisdiccion": r.get("jurisdiccion")
-            }
-
-    # --- Desde tribunales_full.csv ---
-    df_tr = safe_read_csv_pd(path)
+    cols = ["clave", "nombre", "instancia", "domicilio_sede", "contacto", "fuero"]
+
+    # --- Desde los expedientes (si se repite, gana el último) ---
+    if "tribunal" in df.columns:
+        nombre = limpiar_serie(df["tribunal"])
+        desde_exp = pd.DataFrame({
+            "clave": claves_serie(nombre),
+            "nombre": nombre,
+            "instancia": "Primera Instancia",
+            "domicilio_sede": None,
+            "contacto": None,
+            "fuero": df["fuero"] if "fuero" in df.columns else None,
+        })[nombre.notna()]
+        desde_exp = desde_exp.drop_duplicates("clave", keep="last")
+    else:
+        desde_exp = pd.DataFrame(columns=cols)
+
+    # --- Desde la guía (tribunales_full.jsonl / .csv), sin pisar lo anterior ---
+    df_tr = leer_guia(path, path_jsonl)
     if not df_tr.empty:
-        def pick(*cands):
-            for c in df_tr.columns:
-                for cand in cands:
-                    if cand in c.lower():
-                        return c
-            return None
-
-        col_t = pick('titulo', 'tribunal', 'nombre')
-        col_p = pick('path')
-        col_det = pick('detalle', 'direccion', 'domicilio')
-        col_tel = pick('telefono', 'tel')
-        col_mail = pick('email', 'correo')
-
-        for _, r in df_tr.iterrows():
-            titulo = str(r[col_t]).strip()
-            pathv = str(r[col_p]).strip() if col_p in r and pd.notna(r[col_p]) else None
-            nombre = titulo
-            if _es_dependencia(_norm(titulo)):
-                padre = _tribunal_desde_path(pathv)
-                if padre:
-                    nombre = padre
-            key = _norm(nombre)
-            if not key:
-                continue
-
-            tel = str(r[col_tel]).strip() if col_tel in r and pd.notna(r[col_tel]) else None
-            mail = str(r[col_mail]).strip() if col_mail in r and pd.notna(r[col_mail]) else None
-            contacto = " | ".join([p for p in [f"Tel: {tel}" if tel else None,
-                                               f"Email: {mail}" if mail else None] if p])
-
-            if key not in tribunales:
-                tribunales[key] = {
-                    "nombre": nombre,
-                    "instancia": "N/D",
-                    "domicilio_sede": r.get(col_det),
-                    "contacto": contacto or None,
-                    "fuero": None,  # ⚠️ este valor a veces queda en None
-                    "jurisdiccion": "Federal"
-                }
-
-    # --- Asignar IDs ---
-    keys = sorted(tribunales.keys())
-    nombre_to_id = {k: i + 1 for i, k in enumerate(keys)}
+        col_t = _pick_col(df_tr, 'titulo', 'tribunal', 'nombre')
+        col_p = _pick_col(df_tr, 'path')
+        col_det = _pick_col(df_tr, 'detalle', 'direccion', 'domicilio')
+        col_tel = _pick_col(df_tr, 'telefono', 'tel')
+        col_mail = _pick_col(df_tr, 'email', 'correo')
+
+        nombre = _nombre_tribunal_guia(df_tr, col_t, col_p)
+
+        contacto = pd.Series(None, index=df_tr.index, dtype=object)
+        for etiqueta, col in (("Tel", col_tel), ("Email", col_mail)):
+            v = _col_texto(df_tr, col)
+            v = (etiqueta + ": " + v).where(v.notna() & (v != ""), None)
+            contacto = contacto.where(v.isna(), (contacto + " | " + v).fillna(v))
+
+        desde_guia = pd.DataFrame({
+            "clave": claves_serie(nombre),
+            "nombre": nombre,
+            "instancia": "N/D",
+            "domicilio_sede": df_tr[col_det] if col_det else None,
+            "contacto": contacto,
+            "fuero": None,  # ⚠️ este valor a veces queda en None
+        })
+        desde_guia = desde_guia[desde_guia["clave"].notna()].drop_duplicates("clave", keep="first")
+        desde_guia = desde_guia[~desde_guia["clave"].isin(desde_exp["clave"])]
+    else:
+        desde_guia = pd.DataFrame(columns=cols)
+
+    # --- Asignar IDs (estables: de la clave, o del nombre si no tiene clave) ---
+    tribunales = pd.concat([desde_exp[cols], desde_guia[cols]], ignore_index=True)
+    tribunales = tribunales.sort_values("clave", kind="stable").reset_index(drop=True)
+    clave_id = tribunales["clave"].astype(object)
+    tribunales["tribunal_id"] = ids_serie(clave_id.where(clave_id.notna(), tribunales["nombre"]))
+    tribunales["jurisdiccion_id"] = 1
+    fuero = tribunales["fuero"].astype(object)
+    tribunales["fuero"] = fuero.where(fuero.notna() & (fuero != ""), "Desconocido")
+    nombre_to_id = dict(zip(tribunales["clave"], tribunales["tribunal_id"].tolist()))
 
     # --- Escribir CSV ---
-    with open("etl_tribunales.csv", "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(
-            f,
-            fieldnames=[
-                "tribunal_id", "nombre", "instancia",
-                "domicilio_sede", "contacto", "jurisdiccion_id", "fuero"
-            ]
-        )
-        w.writeheader()
-        for k in keys:
-            t = tribunales[k]
-
-            # 🩵 Agregá esta línea justo acá:
-            if not t.get("fuero"):
-                t["fuero"] = "Desconocido"
-
-            w.writerow({
-                "tribunal_id": nombre_to_id[k],
-                "nombre": t["nombre"],
-                "instancia": t.get("instancia"),
-                "domicilio_sede": t.get("domicilio_sede"),
-                "contacto": t.get("contacto"),
-                "jurisdiccion_id": 1,
-                "fuero": t.get("fuero")
-            })
+    tribunales[[
+        "tribunal_id", "nombre", "instancia",
+        "domicilio_sede", "contacto", "jurisdiccion_id", "fuero"
+    ]].to_csv("etl_tribunales.csv", index=False, lineterminator="\r\n")
 
-    print(f"Tribunales únicos: {len(keys)}")
+    print(f"Tribunales únicos: {len(tribunales)}")
     return nombre_to_id
 
 
-def procesar_jueces_y_relaciones(nombre_to_id, path="tribunales_full.csv"):
+def _magistrados_guia(df, col_r, col_i):
+    # Una fila por magistrado, indexada por la fila de la guía de la que sale
+    if col_i:
+        integrantes = df[col_i].where(df[col_i].map(lambda v: isinstance(v, list)), None).explode().dropna()
+        mags = integrantes.map(_magistrado_desde_integrante)
+    elif col_r:
+        mags = df[col_r].where(df[col_r].notna(), None).map(parse_responsables).explode().dropna()
+    else:
+        mags = pd.Series(dtype=object)
+    cols = ["nombre", "cargo", "telefono", "email", "situacion"]
+    return pd.DataFrame(mags.tolist(), index=mags.index, columns=cols)
+
+
+# =========================
+# Parseo de "responsables" (solo para el CSV aplanado)
+# =========================
+
+# Patrones precompilados: separador de bloques (";" o salto de línea) y pares
+# "clave: valor" delimitados por "|". Cada bloque se recorre una sola vez.
+_RE_BLOQUES = re.compile(r"[;\n]")
+_RE_PARES = re.compile(r"([^|:]*):([^|]*)")
+_RE_TELEFONO = re.compile(r"\s*([\d\s/\-]+)")
+
+def tokenizar_responsables(txt):
+    # Lista de bloques (uno por persona), cada uno con todos sus pares
+    # (clave, valor) crudos, en orden y con claves repetidas
+    return [p for p in map(_RE_PARES.findall, _RE_BLOQUES.split(txt)) if p]
+
+def _magistrado_desde_pares(pares):
+    # El crawler repite Cargo y Email (tarjeta + ficha): vale el primero no vacío.
+    # Del teléfono se toma el que tiene números; "Tel:" a veces trae el nombre.
+    primero, tels, email = {}, {}, None
+    for k, v in pares:
+        k = k.strip().lower()
+        if k in ("teléfono", "telefono", "tel"):
+            k = "tel" if k == "tel" else "telefono"
+            m = _RE_TELEFONO.match(v)
+            if m and k not in tels:
+                tels[k] = m.group(1)
+        elif k == "email":
+            if email is None and "@" in v:
+                email = limpiar_texto(v)
+        elif v and k not in primero:
+            primero[k] = v
+    if "nombre" not in primero:
+        return None
+
+    nombre = limpiar_texto(primero["nombre"])
+    tel = limpiar_texto(tels.get("telefono", tels.get("tel")))
+    # Si el "teléfono" en realidad es el nombre, descartarlo
+    if tel and nombre and nombre in tel:
+        tel = None
+    return {
+        "nombre": nombre,
+        "cargo": limpiar_texto(primero.get("cargo")),
+        "telefono": tel,
+        "email": email,
+        "situacion": limpiar_texto(primero.get("situación"))
+    }
+
+def parse_responsables(txt):
+    if not isinstance(txt, str) or not txt.strip():
+        return []
+    mags = (_magistrado_desde_pares(p) for p in tokenizar_responsables(txt))
+    return [m for m in mags if m]
+
+
+def procesar_jueces_y_relaciones(nombre_to_id, path="tribunales_full.csv", path_jsonl="tribunales_full.jsonl"):
     print("Procesando jueces y relaciones tribunal-juez...")
-    df = safe_read_csv_pd(path)
+    df = leer_guia(path, path_jsonl)
     if df.empty:
         print("Advertencia: tribunales_full.csv no encontrado o vacío. Se omite jueces/relaciones.")
         return
 
-    # Función auxiliar para buscar columnas con nombres parecidos
-    def pick(*cands):
-        for c in df.columns:
-            for cand in cands:
-                if cand in c.lower():
-                    return c
-        return None
-
     # Detección flexible de columnas
-    col_t = pick("titulo", "tribunal", "nombre")
-    col_p = pick("path")
-    col_r = pick("responsables")
+    col_t = _pick_col(df, "titulo", "tribunal", "nombre")
+    col_p = _pick_col(df, "path")
+    col_r = _pick_col(df, "responsables")
+    col_i = "integrantes" if "integrantes" in df.columns else None
 
     # =========================
-    # Función de parseo robusta
+    # Tribunal de cada fila de la guía (merge contra nombre_to_id)
     # =========================
-    def parse_responsables(txt):
-        if not isinstance(txt, str) or not txt.strip():
-            return []
-        res = []
-        for b in [b.strip() for b in re.split(r";|\n", txt) if b.strip()]:
-            # Nombre
-            m_nom = re.search(r"Nombre:\s*([^|]+)", b, re.I)
-            if not m_nom:
-                continue
-
-            # Cargo
-            m_car = re.search(r"Cargo:\s*([^|]+)", b, re.I)
-
-            # Teléfono: priorizar el que tiene números reales
-            m_tel = re.search(r"Tel[eé]fono:\s*([\d\s/\-]+)", b, re.I)
-            if not m_tel:
-                # fallback: buscar un Tel: que contenga números
-                m_tel = re.search(r"Tel:\s*([\d\s/\-]+)", b, re.I)
-
-            # Email (puede haber más de uno)
-            m_mai = re.findall(r"Email:\s*([^|;]+)", b, re.I)
-            email = None
-            for e in m_mai:
-                e = limpiar_texto(e)
-                if e and "@" in e:
-                    email = e
-                    break
-
-            # Situación
-            m_sit = re.search(r"Situación:\s*([^|;]+)", b, re.I)
-
-            nombre = limpiar_texto(m_nom.group(1))
-            cargo = limpiar_texto(m_car.group(1)) if m_car else None
-            tel = limpiar_texto(m_tel.group(1)) if m_tel else None
-            sit = limpiar_texto(m_sit.group(1)) if m_sit else None
-
-            # Si el "teléfono" en realidad es el nombre, descartarlo
-            if tel and nombre and nombre in tel:
-                tel = None
-
-            res.append({
-                "nombre": nombre,
-                "cargo": cargo,
-                "telefono": tel,
-                "email": email,
-                "situacion": sit
-            })
-        return res
+    claves = pd.DataFrame({"clave": claves_serie(_nombre_tribunal_guia(df, col_t, col_p))}, index=df.index)
+    ids = pd.DataFrame({"clave": list(nombre_to_id.keys()), "tribunal_id": list(nombre_to_id.values())})
+    tids = claves.reset_index().merge(ids, on="clave", how="left").set_index("index")["tribunal_id"]
+    skip = int(tids.isna().sum())
+    tids = tids.dropna().astype(int)
+
+    mags = _magistrados_guia(df.loc[tids.index], col_r, col_i)
+    mags = mags[mags["nombre"].notna() & (mags["nombre"] != "")]
+    mags.insert(0, "tribunal_id", tids.reindex(mags.index))
 
     # =========================
-    # Procesamiento principal
+    # Jueces: uno por nombre normalizado (id estable), con el primer nombre,
+    # email y teléfono no vacíos
     # =========================
-    jueces = {}
-    relaciones = set()
-    skip = 0
-
-    for _, r in df.iterrows():
-        titulo = str(r[col_t]).strip() if col_t else None
-        pathv = str(r[col_p]).strip() if col_p and pd.notna(r[col_p]) else None
-        nombre_tribunal = titulo
-
-        if _es_dependencia(_norm(titulo)):
-            padre = _tribunal_desde_path(pathv)
-            if padre:
-                nombre_tribunal = padre
-
-        tid = nombre_to_id.get(_norm(nombre_tribunal))
-        if not tid:
-            skip += 1
-            continue
-
-        if col_r and pd.notna(r[col_r]):
-            for mag in parse_responsables(r[col_r]):
-                nombre = mag["nombre"]
-                if not nombre:
-                    continue
-                jueces.setdefault(nombre, {"email": mag.get("email"), "telefono": mag.get("telefono")})
-                # Completar si faltan datos
-                if not jueces[nombre].get("email") and mag.get("email"):
-                    jueces[nombre]["email"] = mag["email"]
-                if not jueces[nombre].get("telefono") and mag.get("telefono"):
-                    jueces[nombre]["telefono"] = mag["telefono"]
-                relaciones.add((tid, nombre, mag.get("cargo"), mag.get("situacion")))
-
-    # Evitar duplicados exactos de nombre
-    jueces = {k: v for k, v in sorted(jueces.items())}
+    mags["clave"] = claves_nombre(mags["nombre"])
+    jueces = mags.groupby("clave", sort=True)[["nombre", "email", "telefono"]].first().reset_index()
+    jueces.insert(0, "juez_id", ids_serie(jueces["clave"]))
+    jmap = dict(zip(jueces["clave"], jueces["juez_id"]))
+
+    relaciones = (mags[["tribunal_id", "nombre", "cargo", "situacion", "clave"]]
+                  .drop_duplicates(["tribunal_id", "nombre", "cargo", "situacion"])
+                  .sort_values(["tribunal_id", "nombre", "cargo", "situacion"], kind="stable"))
+    relaciones["juez_id"] = relaciones["clave"].map(jmap)
+    sit = relaciones["situacion"]
+    relaciones["situacion"] = sit.where(sit.notna() & (sit != ""), "Efectivo")
 
     # =========================
     # Generar CSVs finales
     # =========================
-    keys = sorted(jueces.keys())
-    jmap = {n: i + 1 for i, n in enumerate(keys)}
+    jueces[["juez_id", "nombre", "email", "telefono"]].to_csv(
+        "etl_jueces.csv", index=False, lineterminator="\r\n")
+    relaciones[["tribunal_id", "juez_id", "cargo", "situacion"]].to_csv(
+        "etl_tribunal_juez.csv", index=False, lineterminator="\r\n")
 
-    # etl_jueces.csv
-    with open("etl_jueces.csv", "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=["juez_id", "nombre", "email", "telefono"])
-        w.writeheader()
-        for n in keys:
-            data = jueces[n]
-            w.writerow({
-                "juez_id": jmap[n],
-                "nombre": n,
-                "email": data.get("email"),
-                "telefono": data.get("telefono")
-            })
-
-    # etl_tribunal_juez.csv
-    with open("etl_tribunal_juez.csv", "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=["tribunal_id", "juez_id", "cargo", "situacion"])
-        w.writeheader()
-        for tid, n, c, s in sorted(relaciones):
-            w.writerow({
-                "tribunal_id": tid,
-                "juez_id": jmap[n],
-                "cargo": c,
-                "situacion": s or "Efectivo"
-            })
-
-    print(f"Jueces procesados: {len(keys)}, Relaciones: {len(relaciones)}, sin match: {skip}")
+    print(f"Jueces procesados: {len(jueces)}, Relaciones: {len(relaciones)}, sin match: {skip}")
 
 
 # =========================
 # MAIN
 # =========================
 
+# Qué lee y qué escribe cada etapa; "df_exp" y "nombre_to_id" viajan en memoria
+ETAPAS = [
+    {"nombre": "expedientes", "funcion": procesar_expedientes,
+     "entradas": ["5_expedientes.csv", "scraper_completas_terminadas_expedientes.csv"],
+     "salidas": ["etl_expedientes.csv"], "retorno": "df_exp",
+     "parametros": ["chunksize"]},
+    {"nombre": "intervinientes", "funcion": procesar_intervinientes,
+     "entradas": ["5_intervinientes.csv", "scraper_completas_terminadas_intervinientes.csv"],
+     "salidas": ["etl_partes.csv", "etl_letrados.csv", "etl_representaciones.csv"],
+     "parametros": ["chunksize"]},
+    {"nombre": "resoluciones", "funcion": procesar_resoluciones,
+     "entradas": ["5_resoluciones.csv", "scraper_completas_terminadas_resoluciones.csv"],
+     "salidas": ["etl_resoluciones.csv"],
+     "parametros": ["chunksize"]},
+    {"nombre": "radicaciones", "funcion": procesar_radicaciones,
+     "entradas": ["5_radicaciones.csv", "scraper_completas_terminadas_radicaciones.csv"],
+     "salidas": ["etl_radicaciones.csv"],
+     "parametros": ["chunksize"]},
+    {"nombre": "fueros", "funcion": generar_dim_fueros,
+     "entradas": ["df_exp"], "salidas": ["etl_fueros.csv"]},
+    {"nombre": "jurisdicciones", "funcion": generar_dim_jurisdicciones,
+     "entradas": ["df_exp"], "salidas": ["etl_jurisdicciones.csv"]},
+    {"nombre": "tribunales", "funcion": generar_dim_tribunales,
+     "entradas": ["df_exp", "tribunales_full.csv", "tribunales_full.jsonl"],
+     "salidas": ["etl_tribunales.csv"], "retorno": "nombre_to_id"},
+    {"nombre": "jueces", "funcion": procesar_jueces_y_relaciones,
+     "entradas": ["nombre_to_id", "tribunales_full.csv", "tribunales_full.jsonl"],
+     "salidas": ["etl_jueces.csv", "etl_tribunal_juez.csv"]},
+]
+
+MOTORES = ["pandas", "polars"]
+
+def etapas_del_motor(motor="pandas"):
+    # Mismo grafo; con --engine=polars cada etapa usa su par de motor_polars.py
+    if motor == "pandas":
+        return ETAPAS
+    import motor_polars
+    return [dict(e, funcion=getattr(motor_polars, e["funcion"].__name__)) for e in ETAPAS]
+
+def catalogo_del_motor(motor="pandas"):
+    if motor == "pandas":
+        return CATALOGO
+    import motor_polars
+    return motor_polars.CATALOGO
+
+CACHE_DIR = ".etl_cache"
+
+def version_codigo(motor="pandas"):
+    # Cualquier cambio en el código del ETL (o en pandas/polars) invalida la cache
+    archivos = [__file__, catalogo.__file__, etapas.__file__, lectores.__file__, normalizacion.__file__]
+    versiones = [motor, pd.__version__]
+    if motor == "polars":
+        import motor_polars
+        archivos.append(motor_polars.__file__)
+        versiones.append(motor_polars.pl.__version__)
+    return "|".join(versiones + [hash_archivo(a) for a in archivos])
+
 def main():
+    parser = argparse.ArgumentParser(description="ETL de expedientes a etl_*.csv")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="procesos para las etapas independientes (1 = secuencial; por defecto, uno por CPU)")
+    parser.add_argument("--force", action="store_true",
+                        help="regenerar todas las etapas aunque sus entradas no hayan cambiado")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="leer las fuentes de a N filas; la memoria queda acotada por N más un hash "
+                             "por fila única de salida (por defecto, cada archivo entero)")
+    parser.add_argument("--engine", choices=MOTORES, default="pandas",
+                        help="backend de las etapas: pandas (por defecto) o polars (columnar, multi-hilo)")
+    args = parser.parse_args()
+    try:
+        etapas_motor = etapas_del_motor(args.engine)
+    except ImportError as e:
+        parser.error(f"--engine={args.engine} requiere el paquete {e.name}")
+
     print("=== Iniciando ETL completo ===")
-    df_exp=procesar_expedientes()
-    procesar_intervinientes()
-    procesar_resoluciones()
-    procesar_radicaciones()
-    generar_dim_fueros(df_exp)
-    generar_dim_jurisdicciones(df_exp)
-    nombre_to_id=generar_dim_tribunales(df_exp)
-    procesar_jueces_y_relaciones(nombre_to_id)
+    # Polars no tolera fork con su pool de hilos ya iniciado: ahí los workers
+    # arrancan con spawn. Con fork, la guía de tribunales (que usan dos etapas)
+    # se lee una sola vez acá y los workers la heredan.
+    contexto = multiprocessing.get_context("spawn") if args.engine == "polars" else None
+    if contexto is None:
+        catalogo_del_motor(args.engine).precargar(compartidas(etapas_motor))
+    ejecutar(etapas_motor, workers=args.workers, cache=CACHE_DIR, version=version_codigo(args.engine), forzar=args.force,
+             parametros={"chunksize": args.chunksize}, contexto=contexto)
+    calcular_deltas()
     print("=== ETL finalizado correctamente ===")
 
 if __name__=="__main__":
@@ -13,7 +13,8 @@ CREATE SCHEMA IF NOT EXISTS public;
 -- Fuero
 CREATE TABLE fuero (
     fuero_id SERIAL PRIMARY KEY,
-    nombre VARCHAR(100) NOT NULL UNIQUE
+    nombre VARCHAR(100) NOT NULL UNIQUE,
+    row_hash TEXT -- hash del contenido para cargar_etl --merge (igual en cada tabla que carga)
 );
 
 -- Jurisdicción
@@ -21,18 +22,20 @@ CREATE TABLE jurisdiccion (
     jurisdiccion_id SERIAL PRIMARY KEY,
     ambito VARCHAR(50) NOT NULL,
     provincia VARCHAR(50),
-    departamento_judicial VARCHAR(100)
+    departamento_judicial VARCHAR(100),
+    row_hash TEXT
 );
 
 -- Tribunal
 CREATE TABLE tribunal (
-    tribunal_id SERIAL PRIMARY KEY,
+    tribunal_id BIGINT PRIMARY KEY, -- id estable asignado por el ETL
     nombre VARCHAR(200) UNIQUE NOT NULL,
     instancia VARCHAR(50),
     domicilio_sede TEXT,
     contacto VARCHAR(200),
     fuero VARCHAR(100) NOT NULL,
     jurisdiccion_id INTEGER NOT NULL,
+    row_hash TEXT,
     CONSTRAINT fk_tribunal_jurisdiccion 
         FOREIGN KEY (jurisdiccion_id) REFERENCES jurisdiccion(jurisdiccion_id)
         ON DELETE RESTRICT ON UPDATE CASCADE
@@ -42,7 +45,7 @@ CREATE TABLE tribunal (
 CREATE TABLE secretaria (
     secretaria_id SERIAL PRIMARY KEY,
     nombre VARCHAR(200) NOT NULL,
-    tribunal_id INTEGER NOT NULL,
+    tribunal_id BIGINT NOT NULL,
     CONSTRAINT fk_secretaria_tribunal 
         FOREIGN KEY (tribunal_id) REFERENCES tribunal(tribunal_id)
         ON DELETE CASCADE ON UPDATE CASCADE
@@ -56,12 +59,13 @@ CREATE TABLE tipo_delito (
 
 -- Letrado
 CREATE TABLE letrado (
-    letrado_id SERIAL PRIMARY KEY,
+    letrado_id BIGINT PRIMARY KEY, -- id estable asignado por el ETL
     nombre VARCHAR(200) NOT NULL UNIQUE,
     matricula VARCHAR(50),
     colegio VARCHAR(100),
     email VARCHAR(100),
-    telefono VARCHAR(50)
+    telefono VARCHAR(50),
+    row_hash TEXT
 );
 
 -- ==============================
@@ -80,7 +84,8 @@ CREATE TABLE expediente (
     delitos TEXT,
     fiscal TEXT,
     fiscalia TEXT,
-    id_tribunal INT REFERENCES tribunal(tribunal_id) ON DELETE SET NULL
+    id_tribunal BIGINT REFERENCES tribunal(tribunal_id) ON DELETE SET NULL,
+    row_hash TEXT
 );
 
 -- ==============================
@@ -91,7 +96,10 @@ CREATE TABLE resolucion (
     numero_expediente VARCHAR(50) REFERENCES expediente(numero_expediente) ON DELETE CASCADE,
     fecha DATE,
     nombre TEXT,
-    link TEXT
+    link TEXT,
+    row_hash TEXT,
+    CONSTRAINT uq_resolucion
+        UNIQUE NULLS NOT DISTINCT (numero_expediente, fecha, nombre, link)
 );
 
 -- ==============================
@@ -105,6 +113,7 @@ CREATE TABLE radicacion (
     tribunal TEXT,
     fiscal_nombre TEXT,
     fiscalia TEXT,
+    row_hash TEXT,
     CONSTRAINT fk_radicacion_expediente 
         FOREIGN KEY (numero_expediente) REFERENCES expediente(numero_expediente)
         ON DELETE CASCADE ON UPDATE CASCADE,
@@ -120,11 +129,12 @@ CREATE TABLE radicacion (
 
 -- Parte
 CREATE TABLE parte (
-    parte_id SERIAL PRIMARY KEY,
+    parte_id BIGINT PRIMARY KEY, -- id estable asignado por el ETL
     numero_expediente VARCHAR(50) NOT NULL,
     documento_cuit VARCHAR(20),
     tipo_persona VARCHAR(20) CHECK (tipo_persona IN ('fisica', 'juridica')),
     nombre_razon_social VARCHAR(200),
+    row_hash TEXT,
     CONSTRAINT fk_parte_expediente 
         FOREIGN KEY (numero_expediente) REFERENCES expediente(numero_expediente)
         ON DELETE CASCADE ON UPDATE CASCADE
@@ -133,11 +143,14 @@ CREATE TABLE parte (
 -- Rol de la parte
 CREATE TABLE rol_parte (
     rol_parte_id SERIAL PRIMARY KEY,
-    parte_id INTEGER NOT NULL,
+    parte_id BIGINT NOT NULL,
     nombre VARCHAR(200) NOT NULL,
+    row_hash TEXT,
     CONSTRAINT fk_rol_parte_parte 
         FOREIGN KEY (parte_id) REFERENCES parte(parte_id)
-        ON DELETE CASCADE ON UPDATE CASCADE
+        ON DELETE CASCADE ON UPDATE CASCADE,
+    CONSTRAINT uq_rol_parte_parte_nombre
+        UNIQUE (parte_id, nombre)
 );
 
 -- Relación N:M entre expediente y tipo de delito
@@ -156,9 +169,10 @@ CREATE TABLE expediente_delito (
 -- Representación
 CREATE TABLE representacion (
     numero_expediente VARCHAR(50) NOT NULL,
-    parte_id INTEGER NOT NULL,
-    letrado_id INTEGER NOT NULL,
+    parte_id BIGINT NOT NULL,
+    letrado_id BIGINT NOT NULL,
     rol VARCHAR(100),
+    row_hash TEXT,
     PRIMARY KEY (numero_expediente, parte_id, letrado_id),
     CONSTRAINT fk_repr_exp FOREIGN KEY (numero_expediente)
         REFERENCES expediente(numero_expediente)
@@ -192,10 +206,11 @@ CREATE TABLE plazo (
 -- ============================================
 
 CREATE TABLE juez (
-    juez_id SERIAL PRIMARY KEY,
+    juez_id BIGINT PRIMARY KEY, -- id estable asignado por el ETL
     nombre VARCHAR(200) NOT NULL,
     email VARCHAR(100),
     telefono VARCHAR(50),
+    row_hash TEXT,
     CONSTRAINT uq_juez_nombre UNIQUE (nombre)
 );
 
@@ -204,13 +219,14 @@ CREATE TABLE juez (
 -- ============================================
 
 CREATE TABLE tribunal_juez (
-    tribunal_id INTEGER NOT NULL,
-    juez_id INTEGER NOT NULL,
+    tribunal_id BIGINT NOT NULL,
+    juez_id BIGINT NOT NULL,
     cargo VARCHAR(100),
     situacion VARCHAR(50) DEFAULT 'Efectivo' 
         CHECK (situacion IN ('Efectivo', 'Subrogante', 'Interino', 'Suplente', 'Contratado')),
     fecha_desde DATE,
     fecha_hasta DATE,
+    row_hash TEXT,
     
     PRIMARY KEY (tribunal_id, juez_id),
     
@@ -224,12 +240,57 @@ CREATE TABLE tribunal_juez (
         CHECK (fecha_hasta IS NULL OR fecha_hasta >= fecha_desde)
 );
 
+-- ============================================
+-- Filas rechazadas por cargar_etl (lotes con bisección)
+-- ============================================
+
+CREATE TABLE load_rejects (
+    reject_id SERIAL PRIMARY KEY,
+    tabla TEXT NOT NULL,
+    archivo TEXT,
+    fila BIGINT, -- número de fila de datos en el CSV (0 = primera)
+    datos JSONB,
+    error TEXT,
+    rechazada_en TIMESTAMPTZ DEFAULT now()
+);
+
+-- ============================================
+-- Índices y claves foráneas que cargar_etl --full-reload sacó durante la carga
+-- y todavía no volvió a crear (se restauran al comienzo de la próxima carga)
+-- ============================================
+
+CREATE TABLE load_deferred_ddl (
+    tipo TEXT NOT NULL CHECK (tipo IN ('indice', 'fk')),
+    tabla TEXT NOT NULL,
+    nombre TEXT NOT NULL,
+    definicion TEXT NOT NULL,
+    guardado_en TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (tipo, tabla, nombre)
+);
+
+-- ============================================
+-- Archivos cargados por cargar_etl (se saltean si no cambiaron)
+-- ============================================
+
+CREATE TABLE load_manifest (
+    tabla TEXT PRIMARY KEY,
+    archivo TEXT NOT NULL,
+    checksum TEXT NOT NULL, -- sha256 del CSV y de su cuarentena
+    filas BIGINT,
+    cargado_en TIMESTAMPTZ DEFAULT now()
+);
+
 -- ============================================
 -- Índices
 -- ============================================
 CREATE INDEX idx_expediente_fecha_inicio ON expediente(fecha_inicio);
 CREATE INDEX idx_expediente_fecha_ultimo_movimiento ON expediente(fecha_ultimo_movimiento);
 CREATE INDEX idx_parte_expediente ON parte(numero_expediente);
+-- La carga de representacion resuelve sus claves por las PK de parte, letrado
+-- y expediente; estos dos índices sirven al ON DELETE CASCADE desde parte y
+-- letrado. rol_parte(parte_id) ya lo cubre uq_rol_parte_parte_nombre
+CREATE INDEX idx_representacion_parte ON representacion(parte_id);
+CREATE INDEX idx_representacion_letrado ON representacion(letrado_id);
 CREATE INDEX idx_plazo_expediente ON plazo(numero_expediente);
 CREATE INDEX idx_plazo_vencimiento ON plazo(fecha_vencimiento);
 CREATE INDEX idx_tribunal_jurisdiccion ON tribunal(jurisdiccion_id);
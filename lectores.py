@@ -0,0 +1,98 @@
+# lectores.py
+# Lectura de los CSV de entrada con pyarrow.csv: multi-hilo, con tipos de
+# columna explícitos y el archivo mapeado en memoria. leer_csv devuelve lo
+# mismo que pd.read_csv con las mismas opciones (dtype, keep_default_na,
+# chunksize); sin pyarrow, o con opciones que no cubre, usa pd.read_csv.
+import csv
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = None
+
+# Valores que pandas lee como NaN por defecto (read_csv sin keep_default_na=False)
+NA_PANDAS = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+             "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+
+# =========================
+# Tipos
+# =========================
+
+def _encabezado(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return next(csv.reader(f), [])
+
+def _dtype_de(dtype, col):
+    if isinstance(dtype, dict):
+        return dtype[col] if col in dtype or isinstance(dtype, defaultdict) else None
+    return dtype
+
+def _tipo_arrow(dtype):
+    # Solo los tipos que usan los esquemas del ETL; el resto queda para pandas
+    if dtype in (str, object, "str", "object"):
+        return pa.string()
+    if dtype == "category":
+        return pa.dictionary(pa.int32(), pa.string())
+    if dtype == "Int64":
+        return pa.int64()
+    return None
+
+def _tipos_arrow(path, dtype):
+    nombres = _encabezado(path)
+    if len(set(nombres)) != len(nombres):
+        return None
+    tipos = {c: _tipo_arrow(_dtype_de(dtype, c)) for c in nombres}
+    return None if None in tipos.values() else tipos
+
+def _a_pandas(tabla, inicio=0):
+    df = tabla.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+    # pd.read_csv deja NaN (no None) en las celdas de texto faltantes
+    for c in df.columns:
+        if df[c].dtype == object:
+            df[c] = df[c].where(df[c].notna(), np.nan)
+    df.index = pd.RangeIndex(inicio, inicio + len(df))
+    return df
+
+# =========================
+# Lectura
+# =========================
+
+def _bloques(archivo, opciones, chunksize):
+    # open_csv entrega lotes por tamaño en bytes; se rearman de chunksize filas
+    pendientes, filas, inicio = [], 0, 0
+    for lote in pa_csv.open_csv(archivo, **opciones):
+        pendientes.append(lote)
+        filas += lote.num_rows
+        while filas >= chunksize:
+            tabla = pa.Table.from_batches(pendientes)
+            yield _a_pandas(tabla.slice(0, chunksize), inicio)
+            inicio += chunksize
+            resto = tabla.slice(chunksize)
+            pendientes, filas = resto.to_batches(), resto.num_rows
+    if filas:
+        yield _a_pandas(pa.Table.from_batches(pendientes), inicio)
+
+def leer_csv(path, dtype=None, keep_default_na=True, chunksize=None, **kwargs):
+    tipos = _tipos_arrow(path, dtype) if pa is not None and not kwargs else None
+    if tipos is None:
+        return pd.read_csv(path, dtype=dtype, keep_default_na=keep_default_na, chunksize=chunksize, **kwargs)
+
+    opciones = {
+        "read_options": pa_csv.ReadOptions(use_threads=True),
+        "parse_options": pa_csv.ParseOptions(newlines_in_values=True),
+        "convert_options": pa_csv.ConvertOptions(
+            column_types=tipos,
+            null_values=NA_PANDAS if keep_default_na else [],
+            strings_can_be_null=keep_default_na,
+            quoted_strings_can_be_null=keep_default_na,
+        ),
+    }
+    archivo = pa.memory_map(path)
+    if chunksize:
+        return _bloques(archivo, opciones, chunksize)
+    return _a_pandas(pa_csv.read_csv(archivo, **opciones))
@@ -0,0 +1,435 @@
+# motor_polars.py
+# Backend alternativo del ETL sobre Polars (planes lazy, ejecución columnar y
+# multi-hilo). Implementa las mismas etapas que etl_expedientes.py, con los
+# mismos nombres y firmas, y escribe exactamente los mismos etl_*.csv
+# (incluidas sus rarezas, como los "nan" de partes y letrados).
+# Se elige con: python etl_expedientes.py --engine=polars
+import json
+import os
+
+import polars as pl
+
+from catalogo import Catalogo
+from lectores import NA_PANDAS
+from normalizacion import id_estable
+from etl_expedientes import (CAMARAS, FUERO_POR_CAMARA, parse_date, parse_responsables,
+                             _magistrado_desde_integrante)
+
+# =========================
+# Utilidades
+# =========================
+
+# Los mismos caracteres que str.split()/str.strip() toman como espacio
+_ESPACIOS = "".join(chr(c) for c in range(0x110000) if chr(c).isspace())
+_CLASE_ESPACIOS = "[" + "".join(f"\\x{{{ord(c):x}}}" for c in _ESPACIOS) + "]"
+
+def leer_texto(path):
+    # Como csv.DictReader: todo str, celdas vacías como ""
+    return pl.scan_csv(path, infer_schema=False).with_columns(pl.all().fill_null(""))
+
+def leer_como_pandas(path):
+    # Como pd.read_csv por defecto: las celdas vacías o "NA", "null", ... quedan nulas
+    return pl.scan_csv(path, infer_schema=False, null_values=NA_PANDAS).with_columns(
+        pl.all().replace("", None))
+
+def _concat(lfs, cols):
+    if not lfs:
+        return pl.LazyFrame(schema={c: pl.String for c in cols})
+    return pl.concat(lfs, how="diagonal")
+
+def _columna(nombres, *cols):
+    # Primera columna no vacía entre las que existen (row.get(a) or row.get(b) ...)
+    presentes = [pl.when(pl.col(c) != "").then(pl.col(c)) for c in cols if c in nombres]
+    return pl.coalesce(presentes) if presentes else pl.lit(None, dtype=pl.String)
+
+def limpiar(e):
+    # Igual que limpiar_texto: espacios colapsados, "" -> None
+    e = e.str.replace_all(_CLASE_ESPACIOS + "+", " ").str.strip_chars(" ")
+    return pl.when(e != "").then(e)
+
+def por_valor(e, funcion, dtype=pl.String):
+    # funcion de Python una sola vez por valor distinto de la columna
+    def mapear(s):
+        unicos = s.drop_nulls().unique().to_list()
+        return s.replace_strict(unicos, [funcion(v) for v in unicos], default=None, return_dtype=dtype)
+    return e.map_batches(mapear, return_dtype=dtype, is_elementwise=True)
+
+def convertir_fechas(e):
+    return por_valor(e, parse_date)
+
+def clave(e):
+    # Igual que normalizacion.clave: sin acentos, minúscula, solo [a-z0-9] y espacios
+    e = e.str.normalize("NFD").str.replace_all(r"\p{Mn}", "").str.to_lowercase()
+    e = e.str.replace_all("[^a-z0-9" + _CLASE_ESPACIOS[1:], " ")
+    e = e.str.replace_all(_CLASE_ESPACIOS + "+", " ").str.strip_chars(" ")
+    return pl.when(e != "").then(e)
+
+def _recolectar(lfs, chunksize=None):
+    # Con chunksize, el motor de streaming procesa los planes por lotes
+    return pl.collect_all(lfs, engine="streaming" if chunksize else "auto")
+
+def escribir(df, path, crlf=False):
+    # pandas/csv escriben igual None y "": celda vacía, sin comillas
+    df = df.with_columns(pl.col(pl.String).replace("", None))
+    df.write_csv(path, line_terminator="\r\n" if crlf else "\n")
+
+# =========================
+# 1) EXPEDIENTES
+# =========================
+
+def _sin_prefijo(e):
+    # Lo que sigue al primer ":" (o todo, si no hay), sin espacios
+    return e.str.replace(r"^[^:]*:", "").str.strip_chars(_ESPACIOS)
+
+def _expedientes_desde(lf, estado):
+    nombres = lf.collect_schema().names()
+    rad = pl.coalesce(_columna(nombres, "Radicación del expediente"), pl.lit(""))
+    partes = rad.str.split("|").list.eval(pl.element().str.strip_chars(_ESPACIOS))
+    resto = partes.list.slice(2)
+    up = pl.element().str.to_uppercase()
+    es_fiscal = up.str.starts_with("FISCAL:")
+    es_fiscalia = ~es_fiscal & (up.str.starts_with("FISCALIA") | up.str.starts_with("FISCALÍA"))
+    numero = limpiar(_columna(nombres, "Expediente", "numero_expediente"))
+    m = numero.str.extract_groups(r"^(\w+)\s+\d+/(\d{4})")
+
+    return lf.select(
+        numero_expediente=numero,
+        caratula=limpiar(_columna(nombres, "Carátula", "caratula")),
+        jurisdiccion=pl.when(rad.str.to_uppercase().str.contains("FEDERAL", literal=True))
+                       .then(pl.lit("Federal")).otherwise(pl.lit("Nacional")),
+        tribunal=limpiar(partes.list.get(1, null_on_oob=True)),
+        estado_procesal=pl.lit(estado),
+        fecha_inicio=convertir_fechas(partes.list.get(0, null_on_oob=True)),
+        fecha_ultimo_movimiento=convertir_fechas(limpiar(_columna(nombres, "Última actualización", "fecha_ultimo_mov"))),
+        camara_origen=m.struct[0].str.to_uppercase().replace_strict(CAMARAS, default="Desconocida")
+                      .fill_null("Desconocida"),
+        ano_inicio=m.struct[1].cast(pl.Int64),
+        delitos=limpiar(_columna(nombres, "Delitos", "delitos")),
+        fiscal=limpiar(resto.list.eval(_sin_prefijo(pl.element().filter(es_fiscal))).list.last()),
+        fiscalia=limpiar(resto.list.eval(_sin_prefijo(pl.element().filter(es_fiscalia))).list.last()),
+        fuero=numero.str.split(" ").list.first().str.to_uppercase()
+                    .replace_strict(FUERO_POR_CAMARA, default="Desconocido").fill_null("Desconocido"),
+    )
+
+def procesar_expedientes(chunksize=None):
+    print("Procesando expedientes...")
+    fuentes = [("5_expedientes.csv", "En trámite"),
+               ("scraper_completas_terminadas_expedientes.csv", "Terminada")]
+    fieldnames = [
+        "numero_expediente","caratula","jurisdiccion","tribunal","estado_procesal",
+        "fecha_inicio","fecha_ultimo_movimiento","camara_origen","ano_inicio",
+        "delitos","fiscal","fiscalia"
+    ]
+    lfs = [_expedientes_desde(lf, estado) for p, estado in fuentes for lf in CATALOGO.bloques(p)]
+    exp = _recolectar([_concat(lfs, fieldnames + ["fuero"])], chunksize)[0]
+    escribir(exp.select(fieldnames), "etl_expedientes.csv", crlf=True)
+
+    conteo = dict(exp.group_by("estado_procesal").len().iter_rows()) if len(exp) else {}
+    print(f"Expedientes en trámite: {conteo.get('En trámite', 0)}, terminados: {conteo.get('Terminada', 0)}")
+
+    # Para las dimensiones alcanza con la última combinación de cada tribunal
+    return exp.select("tribunal", "fuero", "jurisdiccion").unique(keep="last", maintain_order=True)
+
+# =========================
+# 2) PARTES / LETRADOS / REPRESENTACIONES
+# =========================
+
+def procesar_intervinientes(chunksize=None):
+    print("Procesando intervinientes...")
+    rename = {"Expediente": "numero_expediente", "Nombre": "nombre", "Rol": "rol", "Letrado": "letrado"}
+    paths = ("5_intervinientes.csv", "scraper_completas_terminadas_intervinientes.csv")
+    df = _concat([lf.rename(rename, strict=False) for p in paths for lf in CATALOGO.bloques(p)],
+                 list(rename.values()))
+    nombres = df.collect_schema().names()
+    # Las celdas vacías pasan por str(NaN) = "nan" igual que en el motor pandas
+    df = df.with_columns(limpiar(pl.col(c).fill_null("nan")) if c in nombres else pl.lit(None, dtype=pl.String).alias(c)
+                         for c in rename.values())
+
+    # Ids estables: parte = (expediente, nombre normalizado, rol); letrado =
+    # nombre normalizado (como normalizacion.claves_nombre)
+    partes = df.drop_nulls(["numero_expediente", "nombre"]).with_columns(
+        clave_parte=pl.concat_str([pl.col("numero_expediente"), pl.coalesce(clave(pl.col("nombre")), pl.col("nombre")),
+                                   pl.col("rol").fill_null("")], separator="\x1f"))
+    partes = partes.with_columns(parte_id=por_valor(pl.col("clave_parte"), id_estable, pl.Int64))
+    con_letrado = partes.drop_nulls("letrado").with_columns(
+        clave_letrado=pl.coalesce(clave(pl.col("letrado")), pl.col("letrado")))
+    con_letrado = con_letrado.with_columns(letrado_id=por_valor(pl.col("clave_letrado"), id_estable, pl.Int64))
+
+    salidas = {
+        "etl_partes.csv": partes.select("parte_id", "numero_expediente", "nombre", "rol").unique(
+            "parte_id", keep="first", maintain_order=True),
+        "etl_letrados.csv": con_letrado.select("letrado_id", pl.col("letrado").alias("nombre")).unique(
+            "letrado_id", keep="first", maintain_order=True),
+        "etl_representaciones.csv": con_letrado.select("numero_expediente", "parte_id", "letrado_id", "rol").unique(
+            keep="first", maintain_order=True),
+    }
+    # Dos claves distintas con el mismo id serían una colisión
+    colisiones = [lf.select(pl.col(c).n_unique() - pl.col(i).n_unique())
+                  for lf, c, i in ((partes, "clave_parte", "parte_id"), (con_letrado, "clave_letrado", "letrado_id"))]
+    res = _recolectar(list(salidas.values()) + colisiones, chunksize)
+    if any(r.item() for r in res[3:]):
+        raise ValueError("Colisión de ids estables en partes o letrados")
+    for path_out, out in zip(salidas, res):
+        escribir(out, path_out)
+    print(f"Partes:{len(res[0])}, Letrados:{len(res[1])}, Representaciones:{len(res[2])}")
+
+# =========================
+# 3) RESOLUCIONES
+# =========================
+
+def procesar_resoluciones(chunksize=None):
+    print("Procesando resoluciones...")
+    cols = ["numero_expediente", "fecha", "nombre", "link"]
+    lfs = []
+    for path in ("5_resoluciones.csv", "scraper_completas_terminadas_resoluciones.csv"):
+        for lf in CATALOGO.bloques(path):
+            nombres = lf.collect_schema().names()
+            lfs.append(lf.select(
+                numero_expediente=limpiar(_columna(nombres, "Expediente", "numero_expediente")),
+                fecha=convertir_fechas(_columna(nombres, "Fecha", "fecha")),
+                nombre=limpiar(_columna(nombres, "Nombre", "nombre")),
+                link=limpiar(_columna(nombres, "Link", "link")),
+            ))
+    out = _concat(lfs, cols).drop_nulls("numero_expediente").unique(keep="first", maintain_order=True)
+    out = _recolectar([out], chunksize)[0]
+    escribir(out, "etl_resoluciones.csv", crlf=True)
+    print(f"Resoluciones combinadas: {len(out)}")
+
+# =========================
+# 4) RADICACIONES
+# =========================
+
+def procesar_radicaciones(chunksize=None):
+    print("Procesando radicaciones...")
+    ren = {"Expediente": "numero_expediente", "Orden": "orden", "Fecha": "fecha_radicacion",
+           "Tribunal": "tribunal", "Fiscal": "fiscal_nombre", "Fiscalía": "fiscalia", "Fiscalia": "fiscalia"}
+    keep = ["numero_expediente", "orden", "fecha_radicacion", "tribunal", "fiscal_nombre", "fiscalia"]
+    paths = ("5_radicaciones.csv", "scraper_completas_terminadas_radicaciones.csv")
+    df = _concat([lf.rename(ren, strict=False) for p in paths for lf in CATALOGO.bloques(p)], keep)
+    nombres = df.collect_schema().names()
+    cols = []
+    for k in keep:
+        if k not in nombres:
+            cols.append(pl.lit(None, dtype=pl.String).alias(k))
+        elif k == "fecha_radicacion":
+            cols.append(convertir_fechas(pl.col(k)))
+        elif k == "orden":
+            cols.append(pl.col(k))
+        else:
+            cols.append(limpiar(pl.col(k).fill_null("nan")))
+    out = df.select(cols).drop_nulls("numero_expediente").unique(keep="first", maintain_order=True)
+    out = _recolectar([out], chunksize)[0]
+    escribir(out, "etl_radicaciones.csv")
+    print(f"Radicaciones combinadas: {len(out)}")
+
+# =========================
+# 5) Dimensiones: FUEROS / JURISDICCIONES
+# =========================
+
+def _valores(df, col):
+    if col not in df.columns:
+        return pl.Series(col, [], dtype=pl.String)
+    v = df[col].drop_nulls().unique()
+    return v.filter(v != "").sort()
+
+def generar_dim_fueros(df):
+    vals = _valores(df, "fuero")
+    out = pl.DataFrame({"fuero_id": range(1, len(vals) + 1), "nombre": vals})
+    escribir(out, "etl_fueros.csv", crlf=True)
+    print(f"Fueros únicos: {len(vals)}")
+
+def generar_dim_jurisdicciones(df):
+    vals = _valores(df, "jurisdiccion")
+    out = pl.DataFrame({"jurisdiccion_id": range(1, len(vals) + 1), "ambito": vals}).with_columns(
+        provincia=pl.lit(None, dtype=pl.String), departamento_judicial=pl.lit("Comodoro Py"))
+    escribir(out, "etl_jurisdicciones.csv", crlf=True)
+    print(f"Jurisdicciones únicas: {len(vals)}")
+
+# =========================
+# 6) Dimensión Tribunales + Jueces
+# =========================
+
+_MAGISTRADO = pl.Struct({c: pl.String for c in ["nombre", "cargo", "telefono", "email", "situacion"]})
+
+def _con_magistrados(df, mags):
+    return df.with_columns(pl.Series("magistrados", mags, dtype=pl.List(_MAGISTRADO)))
+
+def leer_guia_jsonl(path):
+    # Guía con integrantes anidados -> columna "magistrados" (lista de structs)
+    with open(path, encoding="utf-8") as f:
+        filas = [json.loads(l) for l in f if l.strip()]
+    if not filas:
+        return pl.DataFrame()
+    mags = []
+    for f in filas:
+        its = f.pop("integrantes", None)
+        mags.append([_magistrado_desde_integrante(it) for it in its] if isinstance(its, list) else [])
+    return _con_magistrados(pl.from_dicts(filas, infer_schema_length=None), mags)
+
+def leer_guia_csv(path):
+    # Guía aplanada: "responsables" se parsea una vez por texto distinto.
+    # Polars lee una línea en blanco como una fila toda nula; pandas la saltea
+    df = leer_como_pandas(path).filter(~pl.all_horizontal(pl.all().is_null())).collect()
+    col_r = _pick_col(df, "responsables")
+    textos = df[col_r].to_list() if col_r else [None] * len(df)
+    cache = {}
+    mags = [cache[t] if t in cache else cache.setdefault(t, parse_responsables(t)) for t in textos]
+    return _con_magistrados(df, mags)
+
+# Fuentes del motor (ver catalogo.py): las de los expedientes y resoluciones se
+# leen como texto, el resto como lo haría pandas; la guía ya con sus magistrados
+ESQUEMAS = {
+    "5_expedientes.csv": {"lector": leer_texto},
+    "scraper_completas_terminadas_expedientes.csv": {"lector": leer_texto},
+    "5_intervinientes.csv": {"lector": leer_como_pandas},
+    "scraper_completas_terminadas_intervinientes.csv": {"lector": leer_como_pandas},
+    "5_resoluciones.csv": {"lector": leer_texto},
+    "scraper_completas_terminadas_resoluciones.csv": {"lector": leer_texto},
+    "5_radicaciones.csv": {"lector": leer_como_pandas},
+    "scraper_completas_terminadas_radicaciones.csv": {"lector": leer_como_pandas},
+    "tribunales_full.csv": {"lector": leer_guia_csv},
+    "tribunales_full.jsonl": {"lector": leer_guia_jsonl},
+}
+
+CATALOGO = Catalogo(ESQUEMAS, vacio=pl.DataFrame)
+
+def leer_guia(path="tribunales_full.csv", path_jsonl="tribunales_full.jsonl"):
+    # El JSONL (con integrantes anidados) tiene prioridad sobre el CSV aplanado
+    if os.path.exists(path_jsonl):
+        df = CATALOGO.leer(path_jsonl)
+        if len(df):
+            return df
+    return CATALOGO.leer(path)
+
+def _pick_col(df, *cands):
+    # Busca columnas con nombres parecidos
+    for c in df.columns:
+        for cand in cands:
+            if cand in c.lower():
+                return c
+    return None
+
+def _col_texto(col):
+    # str(x).strip() por celda, None si falta la columna o el valor
+    if not col:
+        return pl.lit(None, dtype=pl.String)
+    return pl.col(col).cast(pl.String).str.strip_chars(_ESPACIOS)
+
+def _nombre_tribunal_guia(df):
+    # Las dependencias (salas, secretarías) se asignan al tribunal padre del path
+    cols = [c for c in df.columns if c != "magistrados"]
+    guia = df.select(cols)
+    col_t = _pick_col(guia, "titulo", "tribunal", "nombre")
+    col_p = _pick_col(guia, "path")
+    titulo = pl.col(col_t).cast(pl.String).fill_null("nan").str.strip_chars(_ESPACIOS)
+    tramos = _col_texto(col_p).str.split(">").list.eval(
+        pl.element().str.strip_chars(_ESPACIOS).filter(pl.element().str.strip_chars(_ESPACIOS) != ""))
+    ultimo = tramos.list.get(-1, null_on_oob=True)
+    anteultimo = tramos.list.get(-2, null_on_oob=True)
+    es_sub = clave(ultimo).str.contains("sala", literal=True) | clave(ultimo).str.contains("secretaria", literal=True)
+    padre = pl.when(es_sub.fill_null(False) & anteultimo.is_not_null()).then(anteultimo).otherwise(ultimo)
+    ct = clave(titulo)
+    es_dep = (ct.str.starts_with("sala ") | ct.str.starts_with("secretaria")
+              | ct.str.contains("jurisprudencia", literal=True)).fill_null(False)
+    return pl.when(es_dep & padre.is_not_null()).then(padre).otherwise(titulo)
+
+def generar_dim_tribunales(df, path="tribunales_full.csv", path_jsonl="tribunales_full.jsonl"):
+    print("Extrayendo tribunales (con jerarquía)...")
+    cols = ["clave", "nombre", "instancia", "domicilio_sede", "contacto", "fuero"]
+
+    # --- Desde los expedientes (si se repite, gana el último) ---
+    if "tribunal" in df.columns:
+        desde_exp = df.lazy().select(
+            nombre=limpiar(pl.col("tribunal")),
+            fuero=pl.col("fuero") if "fuero" in df.columns else pl.lit(None, dtype=pl.String),
+        ).drop_nulls("nombre").select(
+            clave=clave(pl.col("nombre")), nombre="nombre", instancia=pl.lit("Primera Instancia"),
+            domicilio_sede=pl.lit(None, dtype=pl.String), contacto=pl.lit(None, dtype=pl.String), fuero="fuero",
+        ).unique("clave", keep="last", maintain_order=True)
+    else:
+        desde_exp = pl.LazyFrame(schema={c: pl.String for c in cols})
+
+    # --- Desde la guía (tribunales_full.jsonl / .csv), sin pisar lo anterior ---
+    df_tr = leer_guia(path, path_jsonl)
+    if len(df_tr):
+        guia = df_tr.drop("magistrados")
+        col_det = _pick_col(guia, "detalle", "direccion", "domicilio")
+        contacto = pl.lit(None, dtype=pl.String)
+        for etiqueta, col in (("Tel", _pick_col(guia, "telefono", "tel")), ("Email", _pick_col(guia, "email", "correo"))):
+            v = _col_texto(col)
+            v = pl.when(v.is_not_null() & (v != "")).then(pl.lit(etiqueta + ": ") + v)
+            contacto = pl.when(v.is_null()).then(contacto).otherwise(
+                pl.when(contacto.is_null()).then(v).otherwise(contacto + " | " + v))
+        nombre = _nombre_tribunal_guia(df_tr)
+        desde_guia = df_tr.lazy().select(
+            clave=clave(nombre), nombre=nombre, instancia=pl.lit("N/D"),
+            domicilio_sede=pl.col(col_det).cast(pl.String) if col_det else pl.lit(None, dtype=pl.String),
+            contacto=contacto, fuero=pl.lit(None, dtype=pl.String),
+        ).drop_nulls("clave").unique("clave", keep="first", maintain_order=True)
+        desde_guia = desde_guia.join(desde_exp.select("clave"), on="clave", how="anti", maintain_order="left")
+    else:
+        desde_guia = pl.LazyFrame(schema={c: pl.String for c in cols})
+
+    # --- Asignar IDs (estables: de la clave, o del nombre si no tiene clave) ---
+    tribunales = (pl.concat([desde_exp.select(cols), desde_guia.select(cols)])
+                  .sort("clave", nulls_last=True, maintain_order=True)
+                  .with_columns(tribunal_id=por_valor(pl.coalesce("clave", "nombre"), id_estable, pl.Int64),
+                                jurisdiccion_id=pl.lit(1),
+                                fuero=pl.when(pl.col("fuero").is_not_null() & (pl.col("fuero") != ""))
+                                        .then(pl.col("fuero")).otherwise(pl.lit("Desconocido")))
+                  .collect())
+    nombre_to_id = dict(zip(tribunales["clave"].to_list(), tribunales["tribunal_id"].to_list()))
+
+    # --- Escribir CSV ---
+    escribir(tribunales.select("tribunal_id", "nombre", "instancia", "domicilio_sede", "contacto",
+                               "jurisdiccion_id", "fuero"), "etl_tribunales.csv", crlf=True)
+
+    print(f"Tribunales únicos: {len(tribunales)}")
+    return nombre_to_id
+
+def procesar_jueces_y_relaciones(nombre_to_id, path="tribunales_full.csv", path_jsonl="tribunales_full.jsonl"):
+    print("Procesando jueces y relaciones tribunal-juez...")
+    df = leer_guia(path, path_jsonl)
+    if not len(df):
+        print("Advertencia: tribunales_full.csv no encontrado o vacío. Se omite jueces/relaciones.")
+        return
+
+    # Tribunal de cada fila de la guía (lookup contra nombre_to_id; como en el
+    # merge de pandas, una clave None también encuentra su id)
+    ids = {k: v for k, v in nombre_to_id.items() if k is not None}
+    c = clave(_nombre_tribunal_guia(df))
+    guia = df.lazy().select(
+        tribunal_id=pl.when(c.is_null()).then(pl.lit(nombre_to_id.get(None), dtype=pl.Int64))
+                      .otherwise(c.replace_strict(list(ids), list(ids.values()), default=None,
+                                                  return_dtype=pl.Int64)),
+        magistrados="magistrados",
+    ).collect()
+    skip = guia["tribunal_id"].null_count()
+
+    mags = (guia.lazy().drop_nulls("tribunal_id")
+            .explode("magistrados").drop_nulls("magistrados").unnest("magistrados")
+            .filter(pl.col("nombre").is_not_null() & (pl.col("nombre") != "")))
+
+    # Jueces: uno por nombre normalizado (id estable), con el primer nombre,
+    # email y teléfono no vacíos
+    mags = mags.with_columns(clave=pl.coalesce(clave(pl.col("nombre")), pl.col("nombre")))
+    jueces = (mags.group_by("clave", maintain_order=True)
+              .agg(pl.col("nombre").first(), pl.col("email").drop_nulls().first(),
+                   pl.col("telefono").drop_nulls().first())
+              .sort("clave")
+              .with_columns(juez_id=por_valor(pl.col("clave"), id_estable, pl.Int64)))
+
+    orden = ["tribunal_id", "nombre", "cargo", "situacion"]
+    relaciones = (mags.select(*orden, "clave")
+                  .unique(orden, keep="first", maintain_order=True)
+                  .sort(orden, nulls_last=True, maintain_order=True)
+                  .join(jueces.select("clave", "juez_id"), on="clave", how="left", maintain_order="left")
+                  .with_columns(situacion=pl.when(pl.col("situacion").is_not_null() & (pl.col("situacion") != ""))
+                                .then(pl.col("situacion")).otherwise(pl.lit("Efectivo"))))
+    jueces, relaciones = pl.collect_all([jueces, relaciones])
+
+    # Generar CSVs finales
+    escribir(jueces.select("juez_id", "nombre", "email", "telefono"), "etl_jueces.csv", crlf=True)
+    escribir(relaciones.select("tribunal_id", "juez_id", "cargo", "situacion"), "etl_tribunal_juez.csv", crlf=True)
+
+    print(f"Jueces procesados: {len(jueces)}, Relaciones: {len(relaciones)}, sin match: {skip}")
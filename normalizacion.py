@@ -0,0 +1,90 @@
+# normalizacion.py
+# Claves normalizadas para comparar nombres (tribunales, partes, letrados):
+# sin acentos, en minúscula, solo [a-z0-9] y espacios simples. También los ids
+# estables (derivados solo de la clave) de tribunales, jueces, partes y letrados.
+import hashlib
+import re
+import unicodedata
+from functools import lru_cache
+
+import pandas as pd
+
+_RE_NO_ALNUM = re.compile(r"[^a-z0-9\s]")
+_RE_ESPACIOS = re.compile(r"\s+")
+
+# =========================
+# Acentos
+# =========================
+
+class _TablaSinMarcas(dict):
+    # Tabla para str.translate que borra las marcas combinantes (categoría Mn).
+    # Se completa sola la primera vez que aparece cada carácter.
+    def __missing__(self, cp):
+        v = None if unicodedata.category(chr(cp)) == "Mn" else cp
+        self[cp] = v
+        return v
+
+_SIN_MARCAS = _TablaSinMarcas()
+
+@lru_cache(maxsize=1 << 16)
+def _quitar_acentos(s):
+    return unicodedata.normalize("NFD", s).translate(_SIN_MARCAS)
+
+# =========================
+# Claves
+# =========================
+
+@lru_cache(maxsize=1 << 16)
+def _clave(s):
+    s = _quitar_acentos(s).lower()
+    s = _RE_NO_ALNUM.sub(" ", s)
+    return _RE_ESPACIOS.sub(" ", s).strip() or None
+
+def clave(s):
+    if s is None:
+        return None
+    return _clave(str(s))
+
+def claves_serie(serie):
+    # clave() sobre una columna: una llamada por valor distinto, faltantes -> None
+    s = serie.astype(object)
+    mapa = {v: clave(v) for v in s[s.notna()].unique()}
+    res = s.map(mapa)
+    return res.where(res.notna(), None)
+
+def claves_nombre(serie):
+    # Nombres de partes y letrados: "PEREZ, JUAN" y "Pérez  Juan" comparten
+    # clave; un nombre sin letras ni números queda tal cual
+    k = claves_serie(serie)
+    return k.where(k.notna(), serie.astype(object))
+
+# =========================
+# Ids estables
+# =========================
+
+_MASCARA_63 = (1 << 63) - 1
+
+def id_estable(clave):
+    # Entero de 63 bits (entra en un BIGINT): el mismo en cada corrida y motor
+    return int.from_bytes(hashlib.blake2b(clave.encode("utf-8"), digest_size=8).digest(), "big") & _MASCARA_63
+
+def clave_compuesta(*cols):
+    # Columnas unidas por \x1f (faltantes como ""), la entrada de id_estable
+    res = None
+    for c in cols:
+        v = c.astype(object).fillna("").astype(str)
+        res = v if res is None else res + "\x1f" + v
+    return res
+
+def ids_serie(claves, registro=None):
+    # id_estable de cada clave, una llamada por clave distinta. registro
+    # (id -> hash de control de la clave) se acumula entre llamadas para
+    # detectar colisiones también entre bloques.
+    unicas = pd.Series(claves.unique(), dtype=object)
+    ids = unicas.map(id_estable).tolist()
+    control = pd.util.hash_pandas_object(unicas, index=False).tolist()
+    registro = {} if registro is None else registro
+    for i, h, c in zip(ids, control, unicas):
+        if registro.setdefault(i, h) != h:
+            raise ValueError(f"Colisión de ids estables: {i} (clave {c!r})")
+    return claves.map(dict(zip(unicas, ids))).astype("int64")
@@ -1,6 +1,7 @@
 import asyncio
 from playwright.async_api import async_playwright
 import csv
+import json
 
 resultados = []
 
@@ -112,7 +113,9 @@ async def scrape_cards(page, nivel=0, path="", filtro_primer_nivel=None):
                             "path": path,
                             "titulo": titulo_card.strip(),
                             "detalle": detalle_card.strip(),
-                            "responsables": resp_str_abierta
+                            "responsables": resp_str_abierta,
+                            # versión estructurada (solo va al JSONL)
+                            "integrantes": integrantes
                         })
 
                 # =============================
@@ -149,13 +152,20 @@ async def run():
 
         await scrape_cards(page, filtro_primer_nivel=filtro)
 
-        # --- escribir CSV con fieldnames correctos ---
+        # --- escribir CSV con fieldnames correctos (compatibilidad) ---
         with open("tribunales_full.csv", "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=["nivel", "path", "titulo", "detalle", "responsables"])
+            writer = csv.DictWriter(f, fieldnames=["nivel", "path", "titulo", "detalle", "responsables"],
+                                    extrasaction="ignore")
             writer.writeheader()
             writer.writerows(resultados)
 
-        print(f"✅ Scrap completo: {len(resultados)} registros guardados en tribunales_full.csv")
+        # --- escribir JSONL con integrantes y fichas anidados (lo lee el ETL) ---
+        with open("tribunales_full.jsonl", "w", encoding="utf-8") as f:
+            for r in resultados:
+                fila = {k: v for k, v in r.items() if k != "responsables"}
+                f.write(json.dumps(fila, ensure_ascii=False) + "\n")
+
+        print(f"✅ Scrap completo: {len(resultados)} registros guardados en tribunales_full.csv y tribunales_full.jsonl")
         await browser.close()
 
 asyncio.run(run())
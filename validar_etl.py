@@ -0,0 +1,180 @@
+# validar_etl.py
+# Validación de los etl_*.csv antes de cargarlos a Postgres. Cada archivo tiene
+# sus reglas (claves requeridas, fechas, rangos, valores permitidos, formato e
+# integridad referencial contra otros etl_*.csv). Las reglas se evalúan por
+# columna, no por fila. Las filas que fallan alguna regla van a cuarentena/
+# (con el número de fila y los motivos) y cargar_etl las saltea; el resumen
+# queda en reporte_validacion.json.
+# Uso: python validar_etl.py
+import json
+import os
+import sys
+import time
+from datetime import date
+
+import pandas as pd
+
+from lectores import leer_csv
+
+DIR_CUARENTENA = "cuarentena"
+REPORTE = "reporte_validacion.json"
+
+EXPEDIENTE = ("etl_expedientes.csv", "numero_expediente")
+
+# Mismos valores que los CHECK de initdb/init.sql
+ESTADOS = ["En trámite", "Terminada"]
+SITUACIONES = ["Efectivo", "Subrogante", "Interino", "Suplente", "Contratado"]
+
+# En orden: cada archivo aparece después de los que referencia
+REGLAS = {
+    "etl_fueros.csv": {
+        "requeridas": ["fuero_id", "nombre"],
+    },
+    "etl_jurisdicciones.csv": {
+        "requeridas": ["jurisdiccion_id", "ambito"],
+    },
+    "etl_tribunales.csv": {
+        "requeridas": ["tribunal_id", "nombre", "fuero", "jurisdiccion_id"],
+        "referencias": {"jurisdiccion_id": ("etl_jurisdicciones.csv", "jurisdiccion_id")},
+    },
+    "etl_expedientes.csv": {
+        "requeridas": ["numero_expediente"],
+        "formato": {"numero_expediente": r"[A-Z]{3} \d+/\d{4}"},
+        "fechas": ["fecha_inicio", "fecha_ultimo_movimiento"],
+        "rangos": {"ano_inicio": (1900, date.today().year)},
+        "valores": {"estado_procesal": ESTADOS},
+    },
+    "etl_partes.csv": {
+        "requeridas": ["parte_id", "numero_expediente"],
+        "referencias": {"numero_expediente": EXPEDIENTE},
+    },
+    "etl_letrados.csv": {
+        "requeridas": ["letrado_id", "nombre"],
+    },
+    "etl_representaciones.csv": {
+        "requeridas": ["numero_expediente", "parte_id", "letrado_id"],
+        "referencias": {"numero_expediente": EXPEDIENTE,
+                        "parte_id": ("etl_partes.csv", "parte_id"),
+                        "letrado_id": ("etl_letrados.csv", "letrado_id")},
+    },
+    "etl_resoluciones.csv": {
+        "requeridas": ["numero_expediente"],
+        "fechas": ["fecha"],
+        "referencias": {"numero_expediente": EXPEDIENTE},
+    },
+    "etl_radicaciones.csv": {
+        "requeridas": ["numero_expediente", "orden"],
+        "fechas": ["fecha_radicacion"],
+        "rangos": {"orden": (1, None)},
+        "referencias": {"numero_expediente": EXPEDIENTE},
+    },
+    "etl_jueces.csv": {
+        "requeridas": ["juez_id", "nombre"],
+    },
+    "etl_tribunal_juez.csv": {
+        "requeridas": ["tribunal_id", "juez_id"],
+        "valores": {"situacion": SITUACIONES},
+        "referencias": {"tribunal_id": ("etl_tribunales.csv", "tribunal_id"),
+                        "juez_id": ("etl_jueces.csv", "juez_id")},
+    },
+}
+
+# =========================
+# Reglas (una máscara booleana por regla: True = fila inválida)
+# =========================
+
+def _vacia(s):
+    # Igual que parse_nullable en cargar_etl: vacío o solo espacios -> NULL
+    return s.str.strip().eq("")
+
+def _fallas(df, reglas, validas):
+    fallas = {}
+    for c in reglas.get("requeridas", []):
+        fallas[f"requerida:{c}"] = _vacia(df[c])
+    for c, patron in reglas.get("formato", {}).items():
+        fallas[f"formato:{c}"] = ~_vacia(df[c]) & ~df[c].str.fullmatch(patron)
+    for c in reglas.get("fechas", []):
+        fechas = pd.to_datetime(df[c], format="%Y-%m-%d", errors="coerce")
+        fallas[f"fecha:{c}"] = ~_vacia(df[c]) & fechas.isna()
+    for c, (minimo, maximo) in reglas.get("rangos", {}).items():
+        n = pd.to_numeric(df[c], errors="coerce")
+        fuera = n.isna() | (n != n.round())
+        if minimo is not None:
+            fuera |= n < minimo
+        if maximo is not None:
+            fuera |= n > maximo
+        fallas[f"rango:{c}"] = ~_vacia(df[c]) & fuera
+    for c, permitidos in reglas.get("valores", {}).items():
+        fallas[f"valor:{c}"] = ~_vacia(df[c]) & ~df[c].isin(permitidos)
+    for c, (archivo, col) in reglas.get("referencias", {}).items():
+        if archivo in validas:
+            fallas[f"referencia:{c}"] = ~_vacia(df[c]) & ~df[c].isin(validas[archivo][col])
+    return pd.DataFrame(fallas, index=df.index)
+
+def _motivos(fallas):
+    # "regla1; regla2" por fila (solo se llama con las filas inválidas)
+    return fallas.dot(fallas.columns + "; ").str[:-2]
+
+# =========================
+# Validación
+# =========================
+
+def validar_archivo(path, reglas, validas):
+    df = leer_csv(path, dtype=str, keep_default_na=False)
+    faltan = [c for r in ("requeridas", "formato", "fechas", "rangos", "valores", "referencias")
+              for c in reglas.get(r, []) if c not in df.columns]
+    if faltan:
+        raise ValueError(f"{path}: faltan columnas {sorted(set(faltan))}")
+
+    fallas = _fallas(df, reglas, validas)
+    malas = fallas.any(axis=1)
+    validas[path] = df[~malas]
+
+    cuarentena = os.path.join(DIR_CUARENTENA, path)
+    if malas.any():
+        df[malas].assign(fila=df.index[malas], motivos=_motivos(fallas[malas])).to_csv(cuarentena, index=False)
+    elif os.path.exists(cuarentena):
+        os.remove(cuarentena)
+
+    return {
+        "filas": len(df),
+        "validas": int((~malas).sum()),
+        "cuarentena": int(malas.sum()),
+        "errores": {r: int(n) for r, n in fallas.sum().items() if n},
+    }
+
+def validar(reglas=REGLAS, reporte=REPORTE):
+    t0 = time.perf_counter()
+    os.makedirs(DIR_CUARENTENA, exist_ok=True)
+    validas, archivos = {}, {}
+    for path, r in reglas.items():
+        if not os.path.exists(path):
+            print(f"Advertencia: no se encontró el archivo {path}. Se omite.")
+            archivos[path] = {"ausente": True}
+            continue
+        archivos[path] = validar_archivo(path, r, validas)
+
+    res = {
+        "generado": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "segundos": round(time.perf_counter() - t0, 3),
+        "cuarentena": sum(a.get("cuarentena", 0) for a in archivos.values()),
+        "archivos": archivos,
+    }
+    with open(reporte, "w", encoding="utf-8") as f:
+        json.dump(res, f, indent=2, ensure_ascii=False)
+
+    for path, a in archivos.items():
+        if a.get("cuarentena"):
+            print(f"  {path}: {a['cuarentena']} de {a['filas']} filas en cuarentena {a['errores']}")
+    print(f"Validación: {res['cuarentena']} filas en cuarentena ({res['segundos']:.2f} s), reporte en {reporte}")
+    return res
+
+def filas_en_cuarentena(path):
+    # Números de fila (0 = primera fila de datos) que no se deben cargar
+    cuarentena = os.path.join(DIR_CUARENTENA, os.path.basename(path))
+    if not os.path.exists(cuarentena):
+        return set()
+    return set(pd.read_csv(cuarentena, usecols=["fila"])["fila"].tolist())
+
+if __name__ == "__main__":
+    sys.exit(1 if validar()["cuarentena"] else 0)